@@ -0,0 +1,154 @@
+"""
+Per-agent queue of the commands parsed from a model response, with preemption.
+
+Agent.turn puts a response's commands here and runs them one at a time. preempt()
+(operator message, pause) drops every command that hasn't started and wakes the
+runner, so a command waiting in interruptible() — WAIT, the post-input settle —
+stops at once. Any other command that has started finishes first: input is never
+half-typed, and the context records which commands were skipped. A preempt during
+the turn's model call holds until start(), which then drops the whole response.
+
+Usage:
+    queue = ActionQueue("agent_1")
+    queue.begin_turn()
+    ...                                               # model call
+    queue.start([("TYPE", ["ls\\n"]), ("WAIT", ["5"])])
+    while (action := queue.get()) is not None:
+        ...
+        await queue.interruptible(asyncio.sleep(5), "WAIT")   # None if preempted meanwhile
+    reason = queue.finish()                           # why it stopped early, or None
+    queue.end_turn()
+
+    queue.preempt("operator message")                 # from another task
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, TypeVar
+
+import metrics
+
+T = TypeVar("T")
+
+
+class Action:
+    """One parsed command and when it was queued."""
+
+    __slots__ = ("cmd", "args", "queued")
+
+    def __init__(self, cmd: str, args: list[str]):
+        self.cmd = cmd
+        self.args = args
+        self.queued = time.perf_counter()
+
+
+class ActionQueue:
+    """Commands of the running turn not yet started. One runner (the turn), preempted from anywhere on the loop."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._pending: deque[Action] = deque()
+        # True from start() to finish() — preempt() outside that has nothing to stop
+        self.running = False
+        # why the running batch was preempted, None if it wasn't
+        self.reason: str | None = None
+        # commands dropped by the preemption
+        self.dropped: list[Action] = []
+        # what the preemption cut short in interruptible(), if anything (e.g. "WAIT")
+        self.interrupted: str | None = None
+        self._preempted = asyncio.Event()
+        self._preempted_at = 0.0
+        # True from begin_turn() to end_turn()
+        self.in_turn = False
+        # preempt() of this turn before start(), applied by start(): (reason, when)
+        self._early: tuple[str, float] | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def begin_turn(self):
+        """A turn started: preempts from here on hold until its commands start."""
+        self.in_turn = True
+        self._early = None
+
+    def end_turn(self):
+        """The turn is over, run or not. An early preempt it never got to is dropped."""
+        self.in_turn = False
+        self._early = None
+
+    def start(self, commands: list[tuple[str, list[str]]]):
+        """Queue a response's commands and mark the queue running. Preempted already if the turn was."""
+        self._pending = deque(Action(cmd, args) for cmd, args in commands)
+        self.running = True
+        self.reason = None
+        self.dropped = []
+        self.interrupted = None
+        self._preempted.clear()
+        self._depth()
+        if self._early is not None:
+            (reason, at), self._early = self._early, None
+            self.preempt(reason)
+            self._preempted_at = at
+
+    def get(self) -> Action | None:
+        """Next command to run, or None once the queue is empty or preempted."""
+        if self.reason is not None or not self._pending:
+            return None
+        action = self._pending.popleft()
+        metrics.observe("intvrface_action_wait_seconds", time.perf_counter() - action.queued, agent=self.name)
+        self._depth()
+        return action
+
+    def preempt(self, reason: str) -> bool:
+        """
+        Drop the commands that haven't started and interrupt an interruptible one. Before
+        start() in a turn, held for start(). False if already preempted or no turn is on.
+        """
+        if not self.running:
+            if not self.in_turn or self._early is not None:
+                return False
+            self._early = (reason, time.perf_counter())
+            return True
+        if self.reason is not None:
+            return False
+        self.reason = reason
+        self.dropped = list(self._pending)
+        self._pending.clear()
+        self._preempted_at = time.perf_counter()
+        self._preempted.set()
+        if self.dropped:
+            metrics.inc("intvrface_actions_dropped_total", len(self.dropped), agent=self.name)
+        self._depth()
+        return True
+
+    async def interruptible(self, aw: Awaitable[T], what: str | None = None) -> T | None:
+        """Await aw unless preempted first — then it is cancelled, recorded as `what` in interrupted, and None returned."""
+        task = asyncio.ensure_future(aw)
+        stop = asyncio.ensure_future(self._preempted.wait())
+        try:
+            done, _ = await asyncio.wait({task, stop}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop.cancel()
+            if not task.done():
+                # preempted, or the turn itself was cancelled
+                task.cancel()
+        if task in done:
+            return task.result()
+        self.interrupted = what
+        # let the command unwind (closes its inotify watch) before the turn goes on
+        await asyncio.wait({task})
+        return None
+
+    def finish(self) -> str | None:
+        """Mark the batch done. Returns the preemption reason, if any."""
+        if self.reason is not None:
+            # preempt() until the runner stopped: how long an operator waited
+            metrics.observe("intvrface_preempt_seconds", time.perf_counter() - self._preempted_at, agent=self.name)
+        self.running = False
+        self._pending.clear()
+        self._depth()
+        return self.reason
+
+    def _depth(self):
+        metrics.gauge("intvrface_action_queue_depth", len(self._pending), agent=self.name)
@@ -1,10 +1,42 @@
 import re
+import time
+import shlex
 import asyncio
+import posixpath
+from typing import Callable, TypeVar
+
+import metrics
+from tracing import Tracer
+from actions import ActionQueue
 from context import Context
-from model import Model
+from model import Model, KVCache
 from container import Container
+from terminal import TerminalLog, ROTATE_BYTES
+from watch import DirWatch
 from prompt import COMMAND_ERROR_PROMPT
 
+# commands that do direct file I/O instead of going through the terminal
+FILE_COMMANDS = {"READ", "WRITE", "EDIT"}
+# minimum arg counts for file commands
+MIN_ARGS = {"READ": 1, "WRITE": 2, "EDIT": 4}
+# commands _run_actions runs itself — anything else the model writes is a no-op, metered as cmd="OTHER"
+# so made-up names can't each start a new metrics series
+ACTION_COMMANDS = {"TYPE", "KEY", "MOVE", "LCLICK", "RCLICK", "DCLICK", "LDOWN", "LUP", "RDOWN", "RUP",
+                   "SCROLLUP", "SCROLLDOWN", "LOOK", "TERM", "TREE", "WAIT"}
+
+# settle after input: done once terminal output and screen are unchanged for SETTLE_QUIET
+SETTLE_MIN = 0.1    # always give the UI this long to react
+SETTLE_MAX = 5.0    # slow page loads get at most this long
+SETTLE_QUIET = 0.3  # shorter than a caret blink (~0.5s) so blinking doesn't count as activity
+SETTLE_POLL = 0.1
+
+# WAIT screen condition: framebuffer hash poll interval (there is no X damage event to wait on from the host)
+SCREEN_POLL = 0.5
+# WAIT term condition: rendered output kept for matching
+WAIT_TERM_CHARS = 20000
+
+T = TypeVar("T")
+
 
 class Agent:
     """
@@ -12,23 +44,97 @@ class Agent:
 
     Turn structure:
         1. model reads streaming context, outputs response
-        2. output added to streaming + original context
+        2. output added to streaming context + archive
         3. output parsed for <func>COMMANDS</func>
         4. commands executed in docker
-        5. feedback (TERM/LOOK) added to context
+        5. feedback (TERM/LOOK/TREE) added to context
         6. check for summarization
+
+    Commands run from an ActionQueue (actions.py): an operator message or pause preempts
+    it between commands, skipping the rest of the list.
+
+    Only what the next model call reads is on the turn's path. Disk writes (archive,
+    working.jsonl, kv cache) are queued on the context's writer thread, and the host
+    broadcasts the context in the background while the next turn runs.
     """
 
-    def __init__(self, name: str, model: Model, use_container: bool = True, novnc_port: int = 6080):
+    def __init__(self, name: str, model: Model, use_container: bool = True, novnc_port: int = 6080,
+                 gui_feedback: str = "look"):
         # name used for context/{name}/ and workspace/{name}/
         self.name = name
         self.model = model
-        self.context = Context(name)
+        # auto-feedback for non-terminal windows: "look" (screenshot) or "tree" (accessibility tree text)
+        self.gui_feedback = gui_feedback
         self.container = Container(name, novnc_port=novnc_port) if use_container else None
+        # per-turn timeline, off unless INTVRFACE_TRACE=1 or enabled from the server
+        self.tracer = Tracer(name)
+        self.term = TerminalLog(self.container.workspace / "term.log") if self.container else None
 
+        # context and kv cache are hydrated on first use, not at construction —
+        # server startup builds every agent and shouldn't read every working.jsonl / kv_cache.pt
+        self._context: Context | None = None
         # kv cache persists across turns for local models
-        self._kv = self.context.load_kv()
+        self._kv: KVCache = None
+        self._kv_loaded = False
         self.chat_mode = False
+        # seconds the last post-input settle waited
+        self.last_settle = 0.0
+        # commands of the running turn, preemptible between commands
+        self.actions = ActionQueue(name)
+        # operator messages that arrived during a turn, added in order once its commands stop
+        self.inbox: list[str] = []
+        # container calls still running in their threads
+        self._calls: set[asyncio.Future] = set()
+
+    def message(self, text: str):
+        """
+        Operator message. Mid-turn it preempts: the running command finishes (a WAIT or settle
+        stops at once), the rest are skipped — all of them if the model is still answering —
+        and the next model call sees the message.
+        """
+        if self.actions.in_turn:
+            self.actions.preempt("operator message")
+            self.inbox.append(text)
+        else:
+            self.context.add("user", content=text)
+
+    async def _call(self, fn: Callable[..., T], *args) -> T:
+        """
+        Run a blocking container call in a thread. Shielded: cancelling the turn doesn't stop the
+        thread, so the call is tracked until it returns — idle() waits for it.
+        """
+        call = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        self._calls.add(call)
+        call.add_done_callback(self._call_done)
+        return await asyncio.shield(call)
+
+    def _call_done(self, call: asyncio.Future):
+        self._calls.discard(call)
+        if not call.cancelled():
+            # retrieved here so a call whose turn was cancelled doesn't log "exception never retrieved"
+            call.exception()
+
+    async def idle(self):
+        """Wait for container calls a cancelled turn left running — nothing is half-typed after this."""
+        if self._calls:
+            await asyncio.wait(list(self._calls))
+
+    def _drain_inbox(self):
+        for text in self.inbox:
+            self.context.add("user", content=text)
+        self.inbox.clear()
+
+    def close(self):
+        """Release the context's writer thread (agent deleted). Blocks until queued writes are done."""
+        if self._context is not None:
+            self._context.close()
+
+    @property
+    def context(self) -> Context:
+        """Context for this agent, loaded from working.jsonl on first access."""
+        if self._context is None:
+            self._context = Context(self.name)
+        return self._context
 
     async def turn(self, user_input: str | None = None) -> str:
         """
@@ -40,12 +146,35 @@ class Agent:
         Returns:
             model's response text
         """
-        # 1. add user input if provided
+        self.actions.begin_turn()
+        try:
+            with self.tracer.activate(), self.tracer.span("turn"), metrics.timer("intvrface_turn_seconds", agent=self.name):
+                return await self._turn(user_input)
+        except asyncio.CancelledError:
+            # paused mid-turn: operator messages still reach the context
+            self._drain_inbox()
+            raise
+        finally:
+            self.actions.end_turn()
+            self.tracer.flush()
+
+    async def _turn(self, user_input: str | None) -> str:
+        if not self._kv_loaded:
+            self._kv = self.context.load_kv()
+            self._kv_loaded = True
+
+        # a write that failed since the last turn (disk full, say) fails this one instead of losing messages silently
+        self.context.check()
+
+        # 1. add user input if provided (and operator messages left by an errored turn)
+        self._drain_inbox()
         if user_input:
             self.context.add("user", content=user_input)
 
         # 2. model reads marshaled context (environment -> user), outputs response
-        response, self._kv = await self.model.call(self.context.marshal(), self._kv)
+        with self.tracer.span("model call"), metrics.timer("intvrface_model_call_seconds", agent=self.name):
+            response, self._kv = await self.model.call(self.context.marshal(), self._kv)
+        self._count_tokens()
 
         if self.chat_mode:
             # chat mode: plain response, no commands
@@ -76,156 +205,398 @@ class Agent:
 
         # 5. execute commands, collect feedback
         if commands and self.container:
-            had_input = False
-
-            # minimum arg counts for file commands
-            MIN_ARGS = {"READ": 1, "WRITE": 2, "EDIT": 4}
-            # commands that do direct file I/O instead of going through the terminal
-            FILE_COMMANDS = {"READ", "WRITE", "EDIT"}
-
-            for cmd, args in commands:
-                # file commands bypass terminal — direct file I/O
-                # commands format: list[tuple[str,list[str]]
-                if cmd in FILE_COMMANDS:
-                    if len(args) < MIN_ARGS[cmd]:
-                        self.context.add("environment", content=f"[SYSTEM]\n{COMMAND_ERROR_PROMPT}")
-                        continue
-                    if cmd == "READ":
-                        self._handle_read(args)
-                    elif cmd == "WRITE":
-                        self._handle_write(args)
-                    elif cmd == "EDIT":
-                        self._handle_edit(args)
-                    continue
-
-                if cmd == "TYPE":
-                    self.container.type_text(args[0] if args else "")
-                    had_input = True
-
-                elif cmd == "KEY":
-                    # join with + for xdotool: each <param> is one key -> ctrl+shift+s
-                    combo = '+'.join(args)
-                    self.container.key(combo)
-                    had_input = True
-
-                elif cmd == "MOVE":
-                    self.container.move(int(args[0]), int(args[1]))
-                    had_input = True
-
-                elif cmd == "LCLICK":
-                    self.container.click(1)
-                    had_input = True
-
-                elif cmd == "RCLICK":
-                    self.container.click(3)
-                    had_input = True
-
-                elif cmd == "DCLICK":
-                    self.container.double_click()
-                    had_input = True
-
-                elif cmd == "LDOWN":
-                    self.container.mousedown(1)
-                    had_input = True
-
-                elif cmd == "LUP":
-                    self.container.mouseup(1)
-                    had_input = True
-
-                elif cmd == "RDOWN":
-                    self.container.mousedown(3)
-                    had_input = True
-
-                elif cmd == "RUP":
-                    self.container.mouseup(3)
-                    had_input = True
-
-                elif cmd == "SCROLLUP":
-                    self.container.scroll("up")
-                    had_input = True
-
-                elif cmd == "SCROLLDOWN":
-                    self.container.scroll("down")
-                    had_input = True
-
-                elif cmd == "LOOK":
-                    self._add_screenshot()
-
-                elif cmd == "TERM":
-                    self._add_terminal()
-
-                elif cmd == "WAIT":
-                    secs = int(args[0]) if args else 5
-                    await asyncio.sleep(secs)
-
-            # 6. auto-feedback: check focused window to give relevant feedback
-            if had_input:
-                await asyncio.sleep(1)
-                focused = self.container.run("xdotool getactivewindow getwindowclassname").strip()
-                if focused == "XTerm":
-                    self._add_terminal()
-                else:
-                    self._add_screenshot()
+            self.actions.start(commands)
+            try:
+                feedback_skipped = await self._run_actions()
+            finally:
+                reason = self.actions.finish()
+            if reason is not None:
+                notes = []
+                if self.actions.interrupted:
+                    notes.append(f"{self.actions.interrupted} interrupted")
+                if self.actions.dropped:
+                    skipped = ", ".join(action.cmd for action in self.actions.dropped)
+                    notes.append(f"{len(self.actions.dropped)} commands skipped ({skipped})")
+                if feedback_skipped:
+                    notes.append("feedback skipped")
+                note = ", ".join(notes) or "all commands had run"
+                self.context.add("environment", content=f"[SYSTEM]\n{reason}: {note}")
+            # operator messages go after what the commands did, before the next model call
+            self._drain_inbox()
 
         # 7. check for summarization
         if self.context.needs_summary():
-            summary, _ = await self.model.summarize(self.context.marshal(), self._kv)
+            with self.tracer.span("summarize"), metrics.timer("intvrface_summarize_seconds", agent=self.name):
+                summary, _ = await self.model.summarize(self.context.marshal(), self._kv)
+            self._count_tokens()
             self.context.apply_summary(summary)
             self._kv = None  # invalidate cache after context change
 
         return response
 
-    def _handle_read(self, args: list[str]):
-        """Read file and add contents with line numbers to context."""
-        assert self.container
-        content = self.container.read_file(args[0])
-        lines = content.split('\n')
-        start = int(args[1]) - 1 if len(args) > 1 else 0
-        end = int(args[2]) if len(args) > 2 else len(lines)
-        numbered = [f"{i + 1 + start:4d}| {line}" for i, line in enumerate(lines[start:end])]
-        self.context.add("environment", content=f"[READ {args[0]}]\n" + '\n'.join(numbered))
-
-    def _handle_write(self, args: list[str]):
-        """Write content to file."""
+    async def _run_actions(self) -> bool:
+        """
+        Run the queued commands in order until the queue is empty or preempted, then auto-feedback.
+        Returns True if a preemption skipped the auto-feedback.
+        """
         assert self.container
-        self.container.write_file(args[0], args[1])
-        self.context.add("environment", content=f"[WRITE {args[0]}] {len(args[1])} chars written")
+        had_input = False
+
+        # consecutive file commands, run together as one batch
+        file_batch: list[tuple[str, list[str]]] = []
+
+        while (action := self.actions.get()) is not None:
+            cmd, args = action.cmd, action.args
+            # file commands bypass terminal — direct file I/O
+            if cmd in FILE_COMMANDS:
+                file_batch.append((cmd, args))
+                continue
+            # anything else may touch files (e.g. typing into a shell) — finish pending file commands first
+            if file_batch:
+                await self._run_file_batch(file_batch)
+                file_batch = []
+            started = time.perf_counter()
+
+            # container calls run off the event loop: each command is an await point,
+            # so an operator message is handled (and preempts) between any two commands
+            if cmd == "TYPE":
+                await self._call(self.container.type_text, args[0] if args else "")
+                had_input = True
+
+            elif cmd == "KEY":
+                # join with + for xdotool: each <param> is one key -> ctrl+shift+s
+                combo = '+'.join(args)
+                await self._call(self.container.key, combo)
+                had_input = True
+
+            elif cmd == "MOVE":
+                await self._call(self.container.move, int(args[0]), int(args[1]))
+                had_input = True
+
+            elif cmd == "LCLICK":
+                await self._call(self.container.click, 1)
+                had_input = True
+
+            elif cmd == "RCLICK":
+                await self._call(self.container.click, 3)
+                had_input = True
+
+            elif cmd == "DCLICK":
+                await self._call(self.container.double_click)
+                had_input = True
+
+            elif cmd == "LDOWN":
+                await self._call(self.container.mousedown, 1)
+                had_input = True
+
+            elif cmd == "LUP":
+                await self._call(self.container.mouseup, 1)
+                had_input = True
+
+            elif cmd == "RDOWN":
+                await self._call(self.container.mousedown, 3)
+                had_input = True
+
+            elif cmd == "RUP":
+                await self._call(self.container.mouseup, 3)
+                had_input = True
+
+            elif cmd == "SCROLLUP":
+                await self._call(self.container.scroll, "up")
+                had_input = True
+
+            elif cmd == "SCROLLDOWN":
+                await self._call(self.container.scroll, "down")
+                had_input = True
+
+            elif cmd == "LOOK":
+                await self._add_screenshot()
+
+            elif cmd == "TERM":
+                await self._add_terminal()
+
+            elif cmd == "TREE":
+                if not await self._add_tree():
+                    self.context.add("environment", content="[TREE]\n[no accessibility tree for focused window]")
+
+            elif cmd == "WAIT":
+                secs = int(args[0]) if args else 5
+                # preemption ends a WAIT at once
+                if len(args) > 1:
+                    # wake early once the condition holds
+                    feedback = await self.actions.interruptible(self._wait_for(args[1], secs), "WAIT")
+                    self.context.add("environment", content=feedback or f"[WAIT] {args[1]} interrupted")
+                else:
+                    await self.actions.interruptible(asyncio.sleep(secs), "WAIT")
+
+            metrics.observe("intvrface_command_seconds", time.perf_counter() - started, agent=self.name,
+                            cmd=cmd if cmd in ACTION_COMMANDS else "OTHER")
+            self.tracer.record(cmd, "command", started, args=len(args))
+
+        if file_batch:
+            await self._run_file_batch(file_batch)
+
+        # 6. auto-feedback: check focused window to give relevant feedback
+        # skipped when preempted — the operator's message shouldn't wait for a screenshot
+        if not had_input:
+            return False
+        if self.actions.reason is not None:
+            return True
+        # wait for the UI to react instead of a fixed sleep
+        with self.tracer.span("settle"):
+            settled = await self.actions.interruptible(self._settle())
+        if settled is None:
+            return True
+        metrics.observe("intvrface_settle_seconds", settled, agent=self.name)
+        # captures run off the event loop — other agents' turns and broadcasts keep going meanwhile
+        focused = (await self._call(self.container.run, "xdotool getactivewindow getwindowclassname")).strip()
+        if focused == "XTerm":
+            await self._add_terminal()
+        # tree mode falls back to a screenshot when the window exposes no accessibility tree
+        elif not (self.gui_feedback == "tree" and await self._add_tree()):
+            await self._add_screenshot()
+        return False
+
+    async def _run_file_batch(self, batch: list[tuple[str, list[str]]]):
+        """
+        Run consecutive file commands as one plan. Feedback is added in command order,
+        identical to running them one by one.
+            - reads of files the batch hasn't modified yet run concurrently
+            - WRITE/EDITs of one file apply to a single in-memory copy, written once at the end
+        """
+        with self.tracer.span("FILE_BATCH", "command", commands=len(batch)), \
+                metrics.timer("intvrface_command_seconds", agent=self.name, cmd="FILE_BATCH"):
+            await self._file_batch(batch)
 
-    def _handle_edit(self, args: list[str]):
-        # args: [0] file path, [1] old text, [2] new text, [3] which occurrence: "all" or 0-indexed int
+    async def _file_batch(self, batch: list[tuple[str, list[str]]]):
+        assert self.container
+        container = self.container
+
+        def key(path: str) -> str:
+            return posixpath.normpath(path)
+
+        # pass 1: find what must come off disk. everything read here is in its pre-batch state
+        modified: set[str] = set()
+        reads: dict[int, asyncio.Future] = {}   # batch index -> READ feedback from disk
+        loads: dict[str, asyncio.Future] = {}   # path -> original content for EDIT
+        for i, (cmd, args) in enumerate(batch):
+            if len(args) < MIN_ARGS[cmd]:
+                continue
+            path = key(args[0])
+            if cmd == "READ" and path not in modified:
+                reads[i] = asyncio.ensure_future(self._call(self._read_text, args))
+            elif cmd == "EDIT" and path not in modified and path not in loads:
+                loads[path] = asyncio.ensure_future(self._call(container.read_file, args[0]))
+            if cmd in ("WRITE", "EDIT"):
+                modified.add(path)
+        # one unreadable file shouldn't sink the rest of the batch — its command reports the error
+        await asyncio.gather(*reads.values(), *loads.values(), return_exceptions=True)
+
+        # pass 2: apply edits in order to in-memory copies, collect feedback
+        files = {path: fut.result() for path, fut in loads.items() if fut.exception() is None}
+        paths: dict[str, str] = {}  # normalized -> path as the model wrote it, for the final write
+        feedback: list[str] = []
+        for i, (cmd, args) in enumerate(batch):
+            if len(args) < MIN_ARGS[cmd]:
+                feedback.append(f"[SYSTEM]\n{COMMAND_ERROR_PROMPT}")
+                continue
+            path = key(args[0])
+            try:
+                if cmd == "READ":
+                    if i in reads:
+                        feedback.append(reads[i].result())
+                    else:
+                        # file was changed earlier in this batch — read the pending copy
+                        start, end = self._read_range(args)
+                        feedback.append(self._format_read(args[0], files[path].split('\n')[start:end], start))
+                elif cmd == "WRITE":
+                    files[path] = args[1]
+                    paths[path] = args[0]
+                    feedback.append(f"[WRITE {args[0]}] {len(args[1])} chars written")
+                elif cmd == "EDIT":
+                    result, text = self._apply_edit(args, files[path])
+                    if result is not None:
+                        files[path] = result
+                        paths[path] = args[0]
+                    feedback.append(text)
+            except Exception as e:
+                # bad params (READ x a b, EDIT occurrence "first") or a file that couldn't be read
+                feedback.append(f"[ERROR. {cmd} {args[0]}] {e!r}")
+
+        # pass 3: one write per changed file
+        writes = await asyncio.gather(*(self._call(container.write_file, raw, files[path]) for path, raw in paths.items()),
+                                      return_exceptions=True)
+        for raw, error in zip(paths.values(), writes):
+            if isinstance(error, Exception):
+                feedback.append(f"[ERROR. WRITE {raw}] {error!r}")
+        for text in feedback:
+            self.context.add("environment", content=text)
+
+    def _read_text(self, args: list[str]) -> str:
+        """READ feedback for a file as it is on disk. Blocking — runs in a worker thread."""
         assert self.container
+        start, end = self._read_range(args)
+        if end is not None:
+            # explicit range: only those lines are read off disk
+            lines = self.container.read_lines(args[0], start, end)
+        else:
+            lines = self.container.read_file(args[0]).split('\n')[start:]
+        return self._format_read(args[0], lines, start)
+
+    def _read_range(self, args: list[str]) -> tuple[int, int | None]:
+        """READ params -> 0-indexed [start, end) slice. end None means to end of file."""
+        # line numbers below 1 (READ path 0 10) mean from the top — islice rejects negative bounds
+        start = max(int(args[1]) - 1, 0) if len(args) > 1 else 0
+        end = max(int(args[2]), 0) if len(args) > 2 else None
+        return start, end
+
+    def _format_read(self, path: str, lines: list[str], start: int) -> str:
+        """READ feedback: lines numbered from start (0-indexed)."""
+        numbered = [f"{i + 1 + start:4d}| {line}" for i, line in enumerate(lines)]
+        return f"[READ {path}]\n" + '\n'.join(numbered)
+
+    def _apply_edit(self, args: list[str], content: str) -> tuple[str | None, str]:
+        """Apply one EDIT to content. Returns (new content or None if unchanged, feedback text)."""
+        # args: [0] file path, [1] old text, [2] new text, [3] which occurrence: "all" or 0-indexed int
         which = args[3]
-        content = self.container.read_file(args[0])
         old, new = args[1], args[2]
         count = content.count(old)
         if count == 0:
-            self.context.add("environment", content=f"[EDIT {args[0]}] text not found")
-            return
+            return None, f"[EDIT {args[0]}] text not found"
         if which == "all":
             result = content.replace(old, new)
         else:
             n = int(which)
             if n >= count:
-                self.context.add("environment", content=f"[ERROR. EDIT {args[0]}] occurrence {n} requested but only {count} found (0-indexed)")
-                return
+                return None, f"[ERROR. EDIT {args[0]}] occurrence {n} requested but only {count} found (0-indexed)"
             # find the start index of the nth occurrence (0-indexed)
             idx = -1
             for _ in range(n + 1):
                 idx = content.index(old, idx + 1)
             result = content[:idx] + new + content[idx + len(old):]
-        self.container.write_file(args[0], result)
-        self.context.add("environment", content=f"[EDIT {args[0]}] done")
+        return result, f"[EDIT {args[0]}] done"
 
-    def _add_screenshot(self):
+    async def _settle(self) -> float:
+        """
+        Wait until terminal output and the framebuffer stop changing, between SETTLE_MIN and SETTLE_MAX.
+        Returns (and stores in last_settle) the seconds waited.
+        """
+        assert self.container and self.term
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(SETTLE_MIN)
+        last = None
+        changed_at = start
+        while True:
+            # term.log size is a host stat. frame hash is one exec, off the event loop
+            sample = (self.term.size(), await self._call(self.container.frame_hash))
+            now = loop.time()
+            if sample != last:
+                last, changed_at = sample, now
+            elif now - changed_at >= SETTLE_QUIET:
+                break
+            if now - start >= SETTLE_MAX:
+                break
+            await asyncio.sleep(SETTLE_POLL)
+        self.last_settle = loop.time() - start
+        return self.last_settle
+
+    async def _wait_for(self, condition: str, secs: float) -> str:
+        """
+        WAIT until condition holds or secs pass. Returns feedback text.
+            term:<regex>   new terminal output matches regex
+            screen         framebuffer differs from when WAIT started
+            file:<path>    path exists
+        term and file (inside /home/agent) wake on inotify events from the bind mount.
+        """
+        assert self.container and self.term
+        container, term = self.container, self.term
+        kind, _, arg = condition.partition(":")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + secs
+
+        if kind == "term":
+            try:
+                pattern = re.compile(arg)
+            except re.error as e:
+                return f"[WAIT] bad pattern {arg!r}: {e}"
+            term.mark()
+            seen = ""
+
+            def met() -> bool:
+                nonlocal seen
+                seen = (seen + "\n" + term.read_new())[-WAIT_TERM_CHARS:]
+                return bool(pattern.search(seen))
+
+            watch_dir = lambda: term.path.parent
+        elif kind == "file":
+            host = container.host_path(arg)
+            if host is None:
+                # outside the mount — no host-side events, ask the container
+                met = lambda: container.run(f"test -e {shlex.quote(arg)} && echo y").strip() == "y"
+                watch_dir = None
+            else:
+                met = host.exists
+                # nearest existing ancestor — re-evaluated each wake as directories get created
+                watch_dir = lambda: next(p for p in host.parents if p.exists())
+        elif kind == "screen":
+            initial = await self._call(container.frame_hash)
+            met = lambda: container.frame_hash() != initial
+            watch_dir = None
+        else:
+            await asyncio.sleep(secs)
+            return f"[WAIT] unknown condition {condition!r}, waited {secs}s"
+
+        while True:
+            if watch_dir is None:
+                ok = await self._call(met)
+            else:
+                # watch first, then check — a change between the two still wakes us
+                with DirWatch(watch_dir()) as w:
+                    ok = met()
+                    remaining = deadline - loop.time()
+                    if not ok and remaining > 0:
+                        await w.wait(remaining)
+            if ok:
+                return f"[WAIT] {condition} met after {loop.time() - start:.1f}s"
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return f"[WAIT] {condition} not met, timed out after {secs}s"
+            if watch_dir is None:
+                await asyncio.sleep(min(SCREEN_POLL, remaining))
+
+    def _count_tokens(self):
+        """Add the last model request's token usage to the metrics counters."""
+        tokens_in, tokens_out = self.model.last_usage
+        metrics.inc("intvrface_tokens_in_total", tokens_in, agent=self.name)
+        metrics.inc("intvrface_tokens_out_total", tokens_out, agent=self.name)
+
+    async def _add_screenshot(self):
         """Take screenshot and add to context as environment feedback."""
         assert self.container
-        path = self.container.screenshot()
+        with self.tracer.span("screenshot", "feedback"), metrics.timer("intvrface_screenshot_capture_seconds", agent=self.name):
+            path = await self._call(self.container.screenshot)
         with open(path, "rb") as f:
             self.context.add("environment", image_bytes=f.read())
 
-    def _add_terminal(self):
-        """Get terminal output and add to context as environment feedback."""
+    async def _add_tree(self) -> bool:
+        """Add the focused window's accessibility tree as text. False if it has none."""
         assert self.container
-        log_path = self.container.workspace / "term.log"
-        output = log_path.read_text()[-5000:] if log_path.exists() else "[no terminal output]"
-        self.context.add("environment", content=f"[TERM]\n{output}")
+        with self.tracer.span("tree", "feedback"):
+            tree = await self._call(self.container.a11y_tree)
+        if not tree:
+            return False
+        self.context.add("environment", content=f"[TREE]\n{tree}")
+        return True
+
+    async def _add_terminal(self):
+        """Get terminal output and add to context as environment feedback."""
+        assert self.container and self.term
+        # reads only the end of term.log, rendered to plain screen text (no escape sequences)
+        with self.tracer.span("terminal read", "feedback"), metrics.timer("intvrface_terminal_read_seconds", agent=self.name):
+            output = self.term.tail()
+        self.context.add("environment", content=f"[TERM]\n{output if output is not None else '[no terminal output]'}")
+        if self.term.size() > ROTATE_BYTES:
+            # docker exec — off the event loop like the other captures
+            await self._call(self.container.rotate_term_log)
@@ -0,0 +1,190 @@
+"""
+Compressed, segmented archive of every context message — the full log, never deleted.
+
+    context/{name}/archive/
+        00000.jsonl.gz   segment: one gzip member per message (still a valid gzip file — zcat reads it whole)
+        00001.jsonl.gz   next segment, started once the current one passes SEGMENT_BYTES
+        index.jsonl      one line per message: {"seq", "seg", "offset", "size", "role", "ts"}
+
+seq is the message's position in the log and its line number in index.jsonl. A message
+or a range is read by seeking to its members and decompressing only those, so old
+screenshots elsewhere in the log are never touched.
+
+A legacy original.jsonl is converted by migrate() (Context does it on load).
+
+Usage:
+    archive = Archive(context_folder)
+    archive.append(json.dumps(msg) + "\\n", msg["role"])
+    archive.read(100, 120)            # messages 100..119
+    archive.select({"command"})       # (seq, message) of one role, other messages not decompressed
+    for msg in archive.messages():    # whole log, streamed
+        ...
+"""
+
+import json
+import time
+import gzip
+import shutil
+import itertools
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+# a segment is closed once it reaches this size
+SEGMENT_BYTES = 64 * 1024 * 1024
+# zlib's default speed/size tradeoff — appends are on the turn path
+COMPRESS_LEVEL = 6
+# index lines are ~100 bytes, so the last one is within this many bytes of the end
+INDEX_TAIL = 4096
+
+
+class Archive:
+    """Append-only message log in gzip segments, with a line-per-message index for random access."""
+
+    def __init__(self, folder: Path, dirname: str = "archive"):
+        self.root = folder
+        self.folder = folder / dirname
+        self.index_path = self.folder / "index.jsonl"
+        self.legacy_path = folder / "original.jsonl"
+        # (next seq, current segment, its size) — read from disk on first append
+        self._state: tuple[int, int, int] | None = None
+
+    def segment_path(self, seg: int) -> Path:
+        return self.folder / f"{seg:05d}.jsonl.gz"
+
+    def exists(self) -> bool:
+        """True if there is anything to read (archive or not-yet-migrated original.jsonl)."""
+        return self.index_path.exists() or self.legacy_path.exists()
+
+    def append(self, line: str, role: str, ts: float | None = None):
+        """Append one serialized message (a json line)."""
+        if self._state is None:
+            self._state = self._load_state()
+        seq, seg, size = self._state
+        if size >= SEGMENT_BYTES:
+            seg, size = seg + 1, 0
+        # mtime=0: no timestamp in the member header, the index has it
+        member = gzip.compress(line.encode(), COMPRESS_LEVEL, mtime=0)
+        with open(self.segment_path(seg), "ab") as f:
+            f.write(member)
+        # index after segment: a crash in between leaves unindexed bytes, never an entry without data
+        entry = {"seq": seq, "seg": seg, "offset": size, "size": len(member), "role": role,
+                 "ts": round(time.time() if ts is None else ts, 3)}
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._state = (seq + 1, seg, size + len(member))
+
+    def __len__(self) -> int:
+        if self._state is None:
+            self._state = self._load_state()
+        return self._state[0]
+
+    def entries(self, start: int = 0, end: int | None = None) -> Iterator[dict]:
+        """Index entries for seq in [start, end)."""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path) as f:
+            for line in itertools.islice(f, start, end):
+                yield json.loads(line)
+
+    def messages(self, start: int = 0, end: int | None = None) -> Iterator[dict]:
+        """Messages with seq in [start, end), streamed. Reads original.jsonl if it hasn't been migrated."""
+        if not self.index_path.exists():
+            if self.legacy_path.exists():
+                with open(self.legacy_path) as f:
+                    for line in itertools.islice(f, start, end):
+                        yield json.loads(line)
+            return
+        handles: dict[int, BinaryIO] = {}
+        try:
+            for entry in self.entries(start, end):
+                f = handles.get(entry["seg"])
+                if f is None:
+                    f = handles[entry["seg"]] = open(self.segment_path(entry["seg"]), "rb")
+                f.seek(entry["offset"])
+                yield json.loads(gzip.decompress(f.read(entry["size"])))
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def select(self, roles: set[str]) -> Iterator[tuple[int, dict]]:
+        """(seq, message) for every message of the given roles. Others are skipped by index role — never decompressed."""
+        if not self.index_path.exists():
+            for seq, msg in enumerate(self.messages()):
+                if msg["role"] in roles:
+                    yield seq, msg
+            return
+        with open(self.index_path) as index:
+            handles: dict[int, BinaryIO] = {}
+            try:
+                for line in index:
+                    entry = json.loads(line)
+                    if entry["role"] not in roles:
+                        continue
+                    f = handles.get(entry["seg"])
+                    if f is None:
+                        f = handles[entry["seg"]] = open(self.segment_path(entry["seg"]), "rb")
+                    f.seek(entry["offset"])
+                    yield entry["seq"], json.loads(gzip.decompress(f.read(entry["size"])))
+            finally:
+                for f in handles.values():
+                    f.close()
+
+    def read(self, start: int, end: int | None = None) -> list[dict]:
+        """Messages with seq in [start, end)."""
+        return list(self.messages(start, end))
+
+    def migrate(self):
+        """Convert a legacy original.jsonl into this archive. Kept as original.jsonl.migrated afterwards."""
+        if not self.legacy_path.exists() or self.index_path.exists():
+            return
+        print(f"[archive] migrating {self.legacy_path}")
+        # built next to the real folder and renamed in, so an interrupted migration just starts over
+        staging = Archive(self.root, self.folder.name + ".tmp")
+        shutil.rmtree(staging.folder, ignore_errors=True)
+        # original timestamps are unknown — the file's mtime is an upper bound for all of them
+        ts = self.legacy_path.stat().st_mtime
+        with open(self.legacy_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    role = json.loads(line)["role"]
+                except json.JSONDecodeError:
+                    if line.endswith("\n"):
+                        raise
+                    # torn final line (crash mid-write) — dropped, as _last_entry does for the index
+                    print(f"[archive] dropping torn last line of {self.legacy_path}")
+                    break
+                staging.append(line, role, ts)
+        staging.folder.mkdir(parents=True, exist_ok=True)
+        # no index — anything here is from a first append that never completed
+        shutil.rmtree(self.folder, ignore_errors=True)
+        staging.folder.rename(self.folder)
+        self.legacy_path.rename(self.legacy_path.with_name("original.jsonl.migrated"))
+        self._state = None
+
+    def _load_state(self) -> tuple[int, int, int]:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        last = self._last_entry()
+        if last is None:
+            return 0, 0, 0
+        seg = last["seg"]
+        path = self.segment_path(seg)
+        return last["seq"] + 1, seg, path.stat().st_size if path.exists() else 0
+
+    def _last_entry(self) -> dict | None:
+        """Last complete index line. A torn final line (crash mid-write) is cut off so seq stays = line number."""
+        if not self.index_path.exists():
+            return None
+        with open(self.index_path, "rb+") as f:
+            # 2: seek relative to end of file
+            f.seek(0, 2)
+            end = f.tell()
+            start = max(end - INDEX_TAIL, 0)
+            f.seek(start)
+            tail = f.read()
+            if tail and not tail.endswith(b"\n"):
+                f.truncate(start + tail.rfind(b"\n") + 1)
+                tail = tail[:tail.rfind(b"\n") + 1]
+        lines = tail.splitlines()
+        return json.loads(lines[-1]) if lines else None
@@ -0,0 +1,13 @@
+"""
+Benchmarks for the agent loop, context and websocket fan-out — no docker, no API.
+
+    fakes.py     FakeModel (scripted responses), FakeContainer (in-process sandbox), FakeClient
+    stats.py     p50/p99/throughput/memory reporting
+    __main__.py  the suites
+    replay.py    replays a recorded session (context archive) against a real sandbox (needs docker)
+
+Run from back/:
+    python -m bench                                   # all suites, defaults
+    python -m bench --agents 8 --turns 50 --context 500 --screen 1920x1080 --clients 20
+    python -m bench context --memory                  # one suite, tracemalloc peak instead of RSS
+"""
@@ -0,0 +1,168 @@
+"""
+Benchmark suites. See bench/__init__.py for usage.
+
+    turn       Agent.turn with FakeModel + FakeContainer, agents running concurrently
+    context    Context.add / flush / marshal / needs_summary / apply_summary at a given length
+    broadcast  server.broadcast of a full context to fake websocket clients
+
+HOME is pointed at a scratch dir before anything from back/ is imported, so
+context/ and workspace/ never touch the real ~/intvrface.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+SCRATCH = tempfile.mkdtemp(prefix="intvrface_bench_")
+os.environ["HOME"] = SCRATCH
+
+import argparse
+import asyncio
+
+import agent as agent_module
+from context import Context
+from bench.fakes import FakeModel, FakeClient, make_agent, make_png
+from bench.stats import Run
+
+# one screenshot per this many preloaded messages, like a session mixing TERM and LOOK feedback
+IMAGE_EVERY = 10
+
+
+def fill(context: Context, n: int, png: bytes):
+    """Add n messages cycling assistant/command/environment, every IMAGE_EVERY-th a screenshot."""
+    roles = ("assistant", "command", "environment")
+    for i in range(n):
+        if i % IMAGE_EVERY == IMAGE_EVERY - 1:
+            context.add("environment", image_bytes=png)
+        else:
+            context.add(roles[i % 3], content=f"message {i}: " + "word " * 40)
+    # preloaded writes done before anything is measured
+    context.flush()
+
+
+async def bench_turn(args) -> list[Run]:
+    if not args.settle:
+        # measure our own work, not the settle sleeps (SETTLE_MIN + SETTLE_QUIET per input turn)
+        agent_module.SETTLE_MIN = agent_module.SETTLE_QUIET = agent_module.SETTLE_POLL = 0
+    png = make_png(*args.screen)
+    agents = [make_agent(f"bench_{i}", FakeModel(latency=args.latency), args.screen) for i in range(args.agents)]
+    for a in agents:
+        fill(a.context, args.context, png)
+
+    async def loop(a, run: Run):
+        for _ in range(args.turns):
+            with run.sample():
+                await a.turn()
+
+    run = Run(f"turn x{args.agents} agents", args.memory)
+    with run:
+        await asyncio.gather(*(loop(a, run) for a in agents))
+    for a in agents:
+        a.context.flush()
+    return [run]
+
+
+async def bench_context(args) -> list[Run]:
+    png = make_png(*args.screen)
+    runs = []
+
+    context = Context("bench_context")
+    add = Run("context.add", args.memory)
+    with add:
+        for i in range(args.context):
+            with add.sample():
+                if i % IMAGE_EVERY == IMAGE_EVERY - 1:
+                    context.add("environment", image_bytes=png)
+                else:
+                    context.add(("assistant", "command", "environment")[i % 3], content=f"message {i}: " + "word " * 40)
+    runs.append(add)
+
+    # add() only queues the disk writes — this is the writer thread catching up
+    flush = Run("context.flush", args.memory)
+    with flush:
+        with flush.sample():
+            context.flush()
+    runs.append(flush)
+
+    for name, fn in (("context.marshal", context.marshal), ("context.needs_summary", context.needs_summary)):
+        run = Run(name, args.memory)
+        with run:
+            for _ in range(args.repeat):
+                with run.sample():
+                    fn()
+        runs.append(run)
+
+    summary = Run("context.apply_summary", args.memory)
+    with summary:
+        for i in range(args.repeat):
+            # apply_summary trims the context, so each sample needs a full one
+            context = Context(f"bench_summary_{i}")
+            fill(context, args.context, png)
+            with summary.sample():
+                context.apply_summary("summary of everything so far")
+            context.flush()
+    runs.append(summary)
+    return runs
+
+
+async def bench_broadcast(args) -> list[Run]:
+    # server imports fastapi/anthropic — only this suite needs them
+    import server
+
+    png = make_png(*args.screen)
+    context = Context("bench_broadcast")
+    fill(context, args.context, png)
+    clients = [FakeClient(args.client_delay) for _ in range(args.clients)]
+    server.clients.update(enumerate(clients))
+
+    run = Run(f"broadcast x{args.clients} clients", args.memory)
+    with run:
+        for _ in range(args.repeat):
+            with run.sample():
+                await server.broadcast({"type": "context", "name": "bench_broadcast", "messages": context.messages})
+    server.clients.clear()
+    print(f"  {clients[0].bytes / max(clients[0].sent, 1) / 2**20:.1f}MB per message per client")
+    return [run]
+
+
+SUITES = {"turn": bench_turn, "context": bench_context, "broadcast": bench_broadcast}
+
+
+def screen_size(text: str) -> tuple[int, int]:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="intvrface benchmarks (no docker, no API)")
+    parser.add_argument("suites", nargs="*", help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--agents", type=int, default=4, help="concurrent agents in the turn suite")
+    parser.add_argument("--turns", type=int, default=30, help="turns per agent")
+    parser.add_argument("--context", type=int, default=200, help="messages in context before measuring")
+    parser.add_argument("--screen", type=screen_size, default=(1280, 800), help="screenshot size, WxH")
+    parser.add_argument("--clients", type=int, default=10, help="websocket clients in the broadcast suite")
+    parser.add_argument("--client-delay", type=float, default=0.0, help="seconds each fake client takes per send")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated model call seconds")
+    parser.add_argument("--repeat", type=int, default=50, help="samples for marshal/needs_summary/apply_summary/broadcast")
+    parser.add_argument("--settle", action="store_true", help="keep the real post-input settle timings")
+    parser.add_argument("--memory", action="store_true", help="report tracemalloc heap peak per run (slower) instead of max RSS")
+    parser.add_argument("--keep", action="store_true", help=f"keep the scratch HOME ({SCRATCH})")
+    try:
+        args = parser.parse_args()
+        unknown = [name for name in args.suites if name not in SUITES]
+        if unknown:
+            parser.error(f"unknown suite: {', '.join(unknown)}")
+        for name in args.suites or SUITES:
+            print(f"[{name}]")
+            for run in asyncio.run(SUITES[name](args)):
+                print(run.report())
+    finally:
+        if "--keep" in sys.argv:
+            print(f"scratch data in {SCRATCH}")
+        else:
+            shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
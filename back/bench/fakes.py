@@ -0,0 +1,177 @@
+"""
+In-process stand-ins for the model, the sandbox container and websocket clients.
+
+FakeModel replays a fixed script of responses. FakeContainer is a real Container
+(same workspace layout, same host-side file I/O and terminal log reading) whose docker
+calls are answered in-process: typing appends shell-like output to term.log, clicks
+focus a "browser", screenshots write a generated PNG. Only /home/agent paths work —
+anything outside the workspace would need docker.
+
+Import after HOME points at a scratch dir — context/ and workspace/ roots are read from it at import.
+"""
+
+import random
+import struct
+import zlib
+import asyncio
+from pathlib import Path
+
+from agent import Agent
+from container import Container
+from model import Model, KVCache
+from terminal import TerminalLog
+
+# one response per turn, cycled. covers the terminal path (TYPE -> TERM), the file batch
+# (WRITE/READ/EDIT) and the GUI path (click -> screenshot)
+NOTES = "\n".join(f"line {i}: some notes about the task" for i in range(50))
+SCRIPT = [
+    "Listing the project.\n<func>TYPE</func><param>ls -la\n</param>",
+    "Writing notes.\n"
+    f"<func>WRITE</func><param>/home/agent/notes.txt</param><param>{NOTES}</param>\n"
+    "<func>READ</func><param>/home/agent/notes.txt</param><param>1</param><param>20</param>\n"
+    "<func>EDIT</func><param>/home/agent/notes.txt</param><param>line 3:</param><param>line three:</param><param>0</param>",
+    "Checking the browser.\n<func>MOVE</func><param>640</param><param>400</param>\n<func>LCLICK</func>",
+]
+
+# printed after every typed command that ends in a newline
+PROMPT = "\x1b[01;32magent@sandbox\x1b[00m:\x1b[01;34m~\x1b[00m$ "
+OUTPUT = "".join(f"-rw-r--r-- 1 agent agent {4096 + i * 37:>6} Oct 19 12:00 \x1b[01;34mfile_{i}.py\x1b[0m\r\n" for i in range(30))
+
+
+def make_png(width: int, height: int) -> bytes:
+    """RGB PNG of the given size. Every 4th row is noise so it doesn't compress to nothing, like a busy screen."""
+    rng = random.Random(0)
+    flat = b"\x00" + b"\xf0\xf0\xf0" * width  # filter byte + light gray row
+    rows = [b"\x00" + rng.randbytes(width * 3) if y % 4 == 0 else flat for y in range(height)]
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    # 8-bit depth, color type 2 (RGB)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b"")
+
+
+class FakeModel(Model):
+    """Returns SCRIPT responses in order, optionally after a simulated API latency."""
+
+    def __init__(self, script: list[str] = SCRIPT, latency: float = 0.0):
+        self.script = script
+        self.latency = latency
+        self.calls = 0
+
+    async def call(self, messages: list[dict], kv_cache: KVCache) -> tuple[str, KVCache]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self.script[self.calls % len(self.script)]
+        self.calls += 1
+        # rough: 4 chars per token. the input side is a fixed guess — counting it would be the benchmark's own cost
+        self.last_usage = (len(messages) * 100, len(response) // 4)
+        return response, None
+
+    async def summarize(self, messages: list[dict], kv_cache: KVCache) -> tuple[str, KVCache]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.last_usage = (len(messages) * 100, 200)
+        return "the agent listed files, wrote notes.txt and clicked around the browser", None
+
+
+class FakeContainer(Container):
+    """Container without docker. Keyboard input goes to a simulated terminal, mouse input focuses a simulated browser."""
+
+    def __init__(self, name: str, screen: tuple[int, int] = (1280, 800)):
+        super().__init__(name)
+        self.workspace.mkdir(parents=True, exist_ok=True)
+        (self.workspace / "screenshots").mkdir(exist_ok=True)
+        self._running = True
+        self.png = make_png(*screen)
+        # window class reported for getactivewindow
+        self.focused = "XTerm"
+        self.log_path = self.workspace / "term.log"
+        self.log_path.write_text(PROMPT)
+
+    def start(self):
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def destroy(self):
+        self._running = False
+
+    def freeze(self):
+        self.frozen = True
+
+    def thaw(self):
+        self.frozen = False
+
+    def run(self, cmd: str) -> str:
+        if "getwindowclassname" in cmd:
+            return self.focused + "\n"
+        return ""
+
+    def _append_term(self, text: str):
+        with open(self.log_path, "a") as f:
+            f.write(text)
+
+    def type_text(self, text: str):
+        self.focused = "XTerm"
+        self._append_term(text.replace("\n", "\r\n"))
+        if text.endswith("\n"):
+            self._append_term(OUTPUT + PROMPT)
+
+    def paste_text(self, text: str):
+        self.type_text(text)
+
+    def key(self, combo: str):
+        self.focused = "XTerm"
+        if combo == "Return":
+            self._append_term("\r\n" + OUTPUT + PROMPT)
+
+    def click(self, button: int = 1):
+        self.focused = "Chromium"
+
+    def double_click(self):
+        self.focused = "Chromium"
+
+    def rotate_term_log(self):
+        cut_path = self.log_path.with_name("term.log.cut")
+        cut = int(cut_path.read_text()) if cut_path.exists() else 0
+        cut_path.write_text(str(cut + self.log_path.stat().st_size))
+        self.log_path.replace(self.log_path.with_name("term.log.1"))
+        self.log_path.write_text("")
+
+    def screenshot(self) -> Path:
+        path = self.workspace / "screenshots" / "screen.png"
+        path.write_bytes(self.png)
+        return path
+
+    def frame_hash(self) -> str:
+        # static screen: settle ends as soon as the terminal log stops growing
+        return "0" * 32
+
+    def a11y_tree(self) -> str:
+        return 'frame "Example - Chromium"\n  document web "Example" @640,400\n    push button "Submit" @640,500'
+
+
+class FakeClient:
+    """websocket stand-in for server.broadcast. delay simulates a slow reader."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = 0
+        self.bytes = 0
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent += 1
+        self.bytes += len(text)
+
+
+def make_agent(name: str, model: Model | None = None, screen: tuple[int, int] = (1280, 800)) -> Agent:
+    """Agent wired to a FakeContainer."""
+    agent = Agent(name, model or FakeModel())
+    agent.container = FakeContainer(name, screen)
+    agent.term = TerminalLog(agent.container.log_path)
+    return agent
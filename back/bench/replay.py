@@ -0,0 +1,138 @@
+"""
+Replay a recorded session against a live sandbox container.
+
+The model is replaced by the recording: each run of consecutive assistant/command
+messages in the archive of context/{name}/ is one model response, returned in order.
+Everything else is the real Agent command path — real Container, settle, screenshots,
+terminal reads, context writes — so environment-side changes can be measured on real workloads.
+
+The replay agent is named replay_{name} (own container, workspace and context) and is
+destroyed afterwards unless --keep. Needs docker, not the API.
+
+Run from back/:
+    python -m bench.replay agent_1
+    python -m bench.replay agent_1 --start 100 --turns 50 --copy-workspace
+"""
+
+import re
+import sys
+import shutil
+import argparse
+import asyncio
+
+import metrics
+from agent import Agent
+from context import CONTEXT_ROOT
+from archive import Archive
+from container import WORKSPACE_ROOT
+from model import Model, KVCache
+from bench.stats import Run
+
+# recorded WAITs are capped at this many seconds (a WAIT 300 for an install would dominate the replay)
+MAX_WAIT = 5
+WAIT_RE = re.compile(r'(<func>WAIT</func>\s*<param>)(\d+)(</param>)')
+# environment-side metrics reported after the replay, besides per-command times
+REPORTED = ("intvrface_settle_seconds", "intvrface_screenshot_capture_seconds",
+            "intvrface_image_encode_seconds", "intvrface_terminal_read_seconds", "intvrface_context_write_seconds")
+
+
+def load_responses(name: str, max_wait: int = MAX_WAIT) -> list[str]:
+    """Model responses of a recorded session: consecutive assistant/command messages joined, summaries skipped."""
+    responses: list[str] = []
+    parts: list[str] = []
+    last = -1
+    # the index knows every message's role: screenshots and terminal output are never decompressed
+    for seq, msg in Archive(CONTEXT_ROOT / name).select({"assistant", "command"}):
+        # a gap in seq is a user/environment message — the end of a model response
+        if seq != last + 1 and parts:
+            responses.append("\n".join(parts))
+            parts = []
+        last = seq
+        text = msg["content"][0].get("text", "")
+        # summaries are archived as assistant messages but were never model turns
+        if not text.startswith("SUMMARIZED CONTEXT:"):
+            parts.append(text)
+    if parts:
+        responses.append("\n".join(parts))
+    cap = lambda m: m.group(1) + str(min(int(m.group(2)), max_wait)) + m.group(3)
+    return [WAIT_RE.sub(cap, r) for r in responses]
+
+
+class ReplayModel(Model):
+    """Returns recorded responses in order, instantly."""
+
+    def __init__(self, responses: list[str]):
+        self.responses = responses
+        self.calls = 0
+
+    async def call(self, messages: list[dict], kv_cache: KVCache) -> tuple[str, KVCache]:
+        response = self.responses[self.calls]
+        self.calls += 1
+        return response, None
+
+    async def summarize(self, messages: list[dict], kv_cache: KVCache) -> tuple[str, KVCache]:
+        return "replayed session", None
+
+
+def _fmt(label: str, hist: metrics.Histogram) -> str:
+    mean = hist.sum / hist.count if hist.count else 0.0
+    return (f"{label:<26} n={hist.count:<6} mean {mean * 1000:>8.1f}ms   "
+            f"p50~{hist.quantile(0.5) * 1000:>8.1f}ms   p99~{hist.quantile(0.99) * 1000:>8.1f}ms")
+
+
+async def replay(args):
+    responses = load_responses(args.name, args.max_wait)[args.start:]
+    if args.turns:
+        responses = responses[:args.turns]
+    if not responses:
+        print(f"no recorded turns for {args.name}")
+        return
+    replay_name = f"replay_{args.name}"
+    agent = Agent(replay_name, ReplayModel(responses))
+    assert agent.container
+    # leftovers of an earlier --keep run
+    agent.container.destroy()
+    if args.copy_workspace:
+        shutil.copytree(WORKSPACE_ROOT / args.name, agent.container.workspace, symlinks=True,
+                        ignore=shutil.ignore_patterns("term.log", "term.log.1"))
+    print(f"starting {replay_name} for {len(responses)} turns")
+    await asyncio.to_thread(agent.container.start)
+
+    run = Run(f"turn ({replay_name})")
+    try:
+        with run:
+            for _ in responses:
+                with run.sample():
+                    await agent.turn()
+    finally:
+        print(run.report())
+        # per command type: histograms recorded by Agent.turn itself
+        for labels, hist in sorted(metrics.snapshot("intvrface_command_seconds", agent=replay_name).items()):
+            assert isinstance(hist, metrics.Histogram)
+            print(_fmt(dict(labels)["cmd"], hist))
+        for name in REPORTED:
+            for hist in metrics.snapshot(name, agent=replay_name).values():
+                assert isinstance(hist, metrics.Histogram)
+                print(_fmt(name.removeprefix("intvrface_").removesuffix("_seconds"), hist))
+        if args.keep:
+            print(f"kept container {replay_name}")
+        else:
+            await asyncio.to_thread(agent.container.destroy)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.replay", description="replay a recorded session against a sandbox")
+    parser.add_argument("name", help="agent whose context/{name}/ archive is replayed")
+    parser.add_argument("--start", type=int, default=0, help="first recorded turn to replay")
+    parser.add_argument("--turns", type=int, default=0, help="turns to replay (default: all)")
+    parser.add_argument("--max-wait", type=int, default=MAX_WAIT, help="cap on recorded WAIT seconds")
+    parser.add_argument("--copy-workspace", action="store_true", help="start from a copy of the agent's workspace")
+    parser.add_argument("--keep", action="store_true", help="keep the replay container, workspace and context")
+    args = parser.parse_args()
+    if not Archive(CONTEXT_ROOT / args.name).exists():
+        parser.error(f"no recording in {CONTEXT_ROOT / args.name}")
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Latency/throughput/memory reporting for benchmark runs.
+
+Usage:
+    with Run("turn", memory=False) as run:
+        for ...:
+            with run.sample():
+                ...
+    print(run.report())
+"""
+
+import time
+import resource
+import tracemalloc
+from contextlib import contextmanager
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """Nearest-rank percentile, p in 0-100."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+class Run:
+    """Collects per-operation latencies for one benchmark, plus wall time and memory."""
+
+    def __init__(self, name: str, memory: bool = False):
+        self.name = name
+        # tracemalloc gives the python heap peak of this run only, but slows allocation-heavy code
+        self.memory = memory
+        self.samples: list[float] = []
+        self.wall = 0.0
+        self.peak_bytes = 0
+
+    def __enter__(self) -> "Run":
+        if self.memory:
+            tracemalloc.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._start
+        if self.memory:
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            # process-wide high-water mark (linux reports KiB)
+            self.peak_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @contextmanager
+    def sample(self):
+        """Time the with-block as one operation."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.append(time.perf_counter() - start)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def report(self) -> str:
+        n = len(self.samples)
+        rate = n / self.wall if self.wall else 0.0
+        kind = "heap peak" if self.memory else "max rss"
+        return (f"{self.name:<26} n={n:<6} {rate:>10.1f}/s   "
+                f"p50 {percentile(self.samples, 50) * 1000:>8.2f}ms   "
+                f"p99 {percentile(self.samples, 99) * 1000:>8.2f}ms   "
+                f"{kind} {self.peak_bytes / 2**20:>7.1f}MB")
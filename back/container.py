@@ -7,6 +7,7 @@ noVNC flow (for human monitoring in browser):
     docker -p (publish) makes host_port a transparent pipe to container:6080
     browser connects to localhost:host_port/vnc.html — same as talking to container:6080
     multi-agent: each agent gets a different host port (6080, 6081, 6082...)
+    pooled containers (POOL_SIZE > 0) get a docker-assigned host port instead, adopted on claim
     this frontend to docker host varied <-> docker 6800 <-> docker vnc 5900 is only used for vnc for now.  
 
 Usage:
@@ -22,10 +23,18 @@ Usage:
     c.stop()
 """
 
+import os
+import stat
 import subprocess
-import time
+import hashlib
+import tempfile
+import itertools
+import posixpath
+import threading
+import uuid
 from pathlib import Path
 import shutil
+import tracing
 
 DOCKERFILE = """
 FROM debian:bookworm-slim
@@ -36,16 +45,19 @@ ENV DEBIAN_FRONTEND=noninteractive
 # xvfb: virtual framebuffer (fake display rendered to memory without physical monitor)
 # x11-apps: basic X11 apps for testing
 # xdotool: simulate keyboard/mouse
+# xclip: set X clipboard/primary selection for pasting long TYPE payloads
 # imagemagick: screenshots via import command (scrot doesn't work with xvfb)
 # xterm: terminal emulator
 # x11vnc: VNC server
 # websockify + novnc: browser-based VNC client
 # openbox: window manager
 # chromium: real .deb on debian (ubuntu only has snap stubs that don't work in docker)
+# at-spi2-core + python3-pyatspi + dbus-x11: accessibility bus and client for TREE (text dump of the focused window)
 RUN apt-get update && apt-get install -y \\
     xvfb \\
     x11-apps \\
     xdotool \\
+    xclip \\
     imagemagick \\
     xterm \\
     x11vnc \\
@@ -53,17 +65,31 @@ RUN apt-get update && apt-get install -y \\
     websockify \\
     chromium \\
     openbox \\
+    at-spi2-core \\
+    python3-pyatspi \\
+    dbus-x11 \\
     && rm -rf /var/lib/apt/lists/*
 
 ENV DISPLAY=:99
+# expose gtk/chromium widgets on the accessibility bus
+ENV ACCESSIBILITY_ENABLED=1
 # chromium runs as root in docker, needs --no-sandbox
-# wrapper script so `chromium &` just works without remembering the flag
-RUN echo '#!/bin/sh' > /usr/local/bin/chromium && echo 'exec /usr/bin/chromium --no-sandbox "$@"' >> /usr/local/bin/chromium && chmod +x /usr/local/bin/chromium
+# --force-renderer-accessibility: build the web page accessibility tree so TREE can see page content
+# wrapper script so `chromium &` just works without remembering the flags
+RUN echo '#!/bin/sh' > /usr/local/bin/chromium && echo 'exec /usr/bin/chromium --no-sandbox --force-renderer-accessibility "$@"' >> /usr/local/bin/chromium && chmod +x /usr/local/bin/chromium
 """
 
-# startup command — passed at runtime, change freely without rebuild
+# printed by the startup command once the display stack is up. the host waits for it in `docker logs -f`
+READY_MARKER = "INTVRFACE_READY"
+
+# dbus session address, sourced by everything that needs the accessibility bus
+DBUS_ENV = "/tmp/dbus.env"
+
+# display stack — shared by fresh containers and pooled ones
 # &: do in background and continue. &&: succeed and continue. ;: execute then continue regardless
-STARTUP_CMD = (
+DISPLAY_CMD = (
+    # session dbus for the accessibility bus. address saved so later docker execs (TREE, pooled xterm) can join it
+    f"dbus-launch --sh-syntax > {DBUS_ENV}; . {DBUS_ENV}; "
     # set up display in the background
     "Xvfb :99 -screen 0 1280x720x24 & "
     # while display not setup yet, output error to stdout then to nothing, sleep 0.1, until done (need to be done for later processes)
@@ -76,135 +102,423 @@ STARTUP_CMD = (
     "websockify --web /usr/share/novnc 6080 localhost:5900 & "
     # openbox: lightweight window manager (alt+Tab, alt+F4, window decorations)
     "openbox & "
-    # script -f: logs terminal to file with immediate flush (xterm -l has buffering issues). script means a program called typescript that logs the terminal.
-    "xterm -e 'script -f /home/agent/term.log' & "
+    # display is up — tell the host (event instead of host-side polling)
+    f"echo {READY_MARKER}; "
+)
+
+# script -f: logs terminal to file with immediate flush (xterm -l has buffering issues). script means a program called typescript that logs the terminal.
+# -a: append (O_APPEND) so the log can be truncated in place on rotation without script writing past the new end
+# sources the dbus env so apps launched from the terminal (chromium) are on the accessibility bus
+XTERM_CMD = f". {DBUS_ENV}; xterm -e 'script -a -f /home/agent/term.log'"
+
+# startup command — passed at runtime, change freely without rebuild
+STARTUP_CMD = (
+    DISPLAY_CMD
+    + XTERM_CMD + " & "
     # do nothing forever. keep container alive
-    "sleep infinity"
+    + "sleep infinity"
 )
 
+# pooled containers boot the display stack only. /home/agent points into the pool slot dir (mounted at /mnt/slot)
+# which receives the agent's workspace on claim, and xterm starts then so term.log lands in the right place
+POOL_STARTUP_CMD = (
+    "ln -s /mnt/slot/home /home/agent; "
+    + DISPLAY_CMD
+    + "sleep infinity"
+)
+
+
+# elements listed by TREE before truncating
+A11Y_MAX_NODES = 400
+
+# runs inside the container (python3 -). prints the focused window's accessibility tree:
+# one line per named or interactive element, indented by depth, with its center coordinates for MOVE
+A11Y_SCRIPT = f"""
+import sys
+import pyatspi
+
+INTERACTIVE = {{"push button", "toggle button", "check box", "radio button", "entry", "password text",
+               "text", "link", "menu item", "combo box", "list item", "page tab", "spin button",
+               "slider", "tree item", "menu", "check menu item", "radio menu item"}}
+
+def active_window():
+    for app in pyatspi.Registry.getDesktop(0):
+        for win in app or []:
+            if win and win.getState().contains(pyatspi.STATE_ACTIVE):
+                return app, win
+    return None, None
+
+app, win = active_window()
+if win is None:
+    sys.exit(0)
+print(f"window: {{app.name}} - {{win.name}}")
+count = 0
+
+def walk(node, depth):
+    global count
+    if node is None or count >= {A11Y_MAX_NODES}:
+        return
+    try:
+        state = node.getState()
+    except Exception:
+        return
+    # offscreen subtrees (collapsed menus, other tabs) aren't actionable
+    if not state.contains(pyatspi.STATE_SHOWING):
+        return
+    role = node.getRoleName()
+    name = " ".join((node.name or "").split())[:80]
+    if name or role in INTERACTIVE:
+        line = "  " * depth + role + (f' "{{name}}"' if name else "")
+        if role in ("entry", "password text", "text", "combo box", "spin button"):
+            try:
+                value = " ".join(node.queryText().getText(0, -1).split())[:80]
+                if value and role != "password text":
+                    line += f' value="{{value}}"'
+            except NotImplementedError:
+                pass
+        try:
+            ext = node.queryComponent().getExtents(pyatspi.DESKTOP_COORDS)
+            line += f" @{{ext.x + ext.width // 2}},{{ext.y + ext.height // 2}}"
+        except NotImplementedError:
+            pass
+        if state.contains(pyatspi.STATE_FOCUSED):
+            line += " [focused]"
+        print(line)
+        count += 1
+        depth += 1
+    for child in node:
+        walk(child, depth)
+
+walk(win, 0)
+if count >= {A11Y_MAX_NODES}:
+    print("... truncated at {A11Y_MAX_NODES} elements")
+"""
+
+# workspace mount point inside the container
+AGENT_HOME = "/home/agent"
 
 # data stored in ~/intvrface/
 WORKSPACE_ROOT = Path.home() / "intvrface" / "workspace"
+# one dir per pooled container, mounted at /mnt/slot. a claimed agent's workspace lives in {slot}/home
+POOL_ROOT = Path.home() / "intvrface" / "pool"
+
+# number of pre-booted containers kept warm for Container.start. 0 disables the pool
+POOL_SIZE = 0
+POOL_PREFIX = "intvrface_pool_"
+
+# TYPE text longer than this is pasted through the X selection instead of typed key by key (xdotool types ~12ms/char)
+PASTE_THRESHOLD = 200
+
+# dashboard thumbnails: workspace/screenshots/thumb.jpg, this wide, jpeg quality
+THUMB_WIDTH = 320
+THUMB_QUALITY = 60
+# written to a temp name and renamed so the host never reads a half-written jpeg
+THUMB_CMD = (f"-resize {THUMB_WIDTH}x -quality {THUMB_QUALITY} jpg:/home/agent/screenshots/.thumb.jpg && "
+             "mv /home/agent/screenshots/.thumb.jpg /home/agent/screenshots/thumb.jpg")
+
+# per-container resource quota passed to docker run (--cpus, --memory), so many agents share a host predictably
+CPU_LIMIT = "2"
+MEMORY_LIMIT = "4g"
+LIMIT_ARGS = ["--cpus", CPU_LIMIT, "--memory", MEMORY_LIMIT]
+
+
+def running_containers() -> dict[str, str]:
+    """Name -> state ("running" or "paused") of all live docker containers, from a single `docker ps` call."""
+    result = subprocess.run(
+        # ps: list live containers (paused ones included), --format: name and state per line
+        ["docker", "ps", "--format", "{{.Names}} {{.State}}"],
+        capture_output=True, text=True
+    )
+    return dict(line.split(' ', 1) for line in result.stdout.strip().split('\n') if line)
+
+
+# content hash of DOCKERFILE, used as the image tag — a changed Dockerfile is simply a different tag
+DOCKERFILE_HASH = hashlib.sha256(DOCKERFILE.encode()).hexdigest()[:12]
+
+# image tags known to exist. after the first docker query the rebuild check is a set lookup
+_built_images: set[str] = set()
+# parallel starts must not race to build the same image
+_build_lock = threading.Lock()
+
+
+def ensure_image(image: str) -> str:
+    """Return the content-hash tag for image, building it first if missing."""
+    tag = f"{image}:{DOCKERFILE_HASH}"
+    if tag in _built_images:
+        return tag
+    with _build_lock:
+        # another thread may have built it while we waited for the lock
+        if tag in _built_images:
+            return tag
+        # -q: only print hex IDs. none returned means this Dockerfile version was never built
+        result = subprocess.run(["docker", "images", "-q", tag], capture_output=True, text=True)
+        if not result.stdout.strip():
+            print("Dockerfile changed or image missing, rebuilding...", flush=True)
+            _remove_stale_images(image, tag)
+            build_image(tag)
+        _built_images.add(tag)
+    return tag
+
+
+def build_image(tag: str):
+    """Build the docker image from DOCKERFILE."""
+    build_dir = Path.home() / "intvrface" / "docker_build"
+    build_dir.mkdir(parents=True, exist_ok=True)
+    (build_dir / "Dockerfile").write_text(DOCKERFILE)
+
+    print("Building docker image...")
+    # running a command in a new process and waits for it to finish
+    subprocess.run(
+        ["docker", "build", "-t", tag, str(build_dir)], #Docker hardcoded to look for 'Dockerfile' in path provided
+        check=True, # if fail raise exception
+    )
+    print(f"Image '{tag}' built.")
+
+
+def _remove_stale_images(image: str, keep: str):
+    """Remove older tags of image and every container (agents + pool) created from them."""
+    result = subprocess.run(
+        ["docker", "images", image, "--format", "{{.Repository}}:{{.Tag}}"],
+        capture_output=True, text=True
+    )
+    # unclaimed pool containers are on the old image too
+    pool.clear()
+    for old in result.stdout.split():
+        if old == keep:
+            continue
+        # nuke old containers using this image — they're stale
+        containers = subprocess.run(
+            ["docker", "ps", "-a", "-q", "--filter", f"ancestor={old}"],
+            capture_output=True, text=True
+        )
+        for cid in containers.stdout.split():
+            subprocess.run(["docker", "rm", "-f", cid], capture_output=True)
+        subprocess.run(["docker", "rmi", old], capture_output=True)
+
+
+def wait_ready(name: str):
+    """Block until the container's startup command prints READY_MARKER."""
+    # docker logs -f streams the container's stdout as it's written — wakes on the marker line, no sleep loop
+    with subprocess.Popen(
+        ["docker", "logs", "-f", name],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    ) as proc:
+        assert proc.stdout
+        for line in proc.stdout:
+            if line.strip() == READY_MARKER:
+                proc.kill()
+                return
+    # log stream ended without the marker — container exited during startup
+    raise RuntimeError(f"container {name} exited before display was ready")
+
+
+class ContainerPool:
+    """
+    Warm pool of pre-booted sandbox containers (xvfb, x11vnc, websockify, openbox already up).
+
+    Container.start claims one instead of booting from scratch:
+        1. agent workspace is moved into the slot dir (same filesystem rename, instant)
+           and workspace/{name} is left as a symlink to it so host-side paths keep working
+        2. container is renamed to the agent name
+        3. xterm is started, logging to /home/agent/term.log
+
+    docker can't add a port mapping to a running container, so pooled containers publish
+    noVNC on a docker-assigned host port and the claiming Container adopts that port.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, image: str = "intvrface_sandbox"):
+        self.size = size
+        self.image = image
+        self._ready: list[str] = []  # booted, unclaimed container names
+        self._booting = 0
+        # claim() runs in to_thread workers, refills run in their own threads
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Remove pool containers left over from a previous server run, then fill the pool."""
+        self.clean()
+        self.refill()
+
+    def clean(self):
+        """Remove every pool container on this docker host, including other processes' (only call before any refill)."""
+        result = subprocess.run(
+            ["docker", "ps", "-a", "--format", "{{.Names}}", "--filter", f"name=^{POOL_PREFIX}"],
+            capture_output=True, text=True
+        )
+        for slot in result.stdout.split():
+            self._remove(slot)
+
+    def claim(self) -> str | None:
+        """Take a ready container, or None if the pool is empty. Refills in the background."""
+        with self._lock:
+            slot = self._ready.pop(0) if self._ready else None
+        self.refill()
+        return slot
+
+    def refill(self):
+        """Boot containers in background threads until `size` are ready or booting."""
+        with self._lock:
+            missing = max(self.size - len(self._ready) - self._booting, 0)
+            self._booting += missing
+        for _ in range(missing):
+            threading.Thread(target=self._boot, daemon=True).start()
+
+    def clear(self):
+        """Remove all unclaimed pool containers (e.g. image was rebuilt under them)."""
+        with self._lock:
+            slots, self._ready = self._ready, []
+        for slot in slots:
+            self._remove(slot)
+
+    def _boot(self):
+        slot = POOL_PREFIX + uuid.uuid4().hex[:8]
+        slot_dir = POOL_ROOT / slot
+        slot_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            tag = ensure_image(self.image)
+            subprocess.run([
+                "docker", "run", "-d", "--name", slot,
+                *LIMIT_ARGS,
+                # publish container 6080 on a host port docker picks
+                "-p", "6080",
+                "-v", f"{slot_dir.absolute()}:/mnt/slot",
+                tag,
+                "bash", "-c", POOL_STARTUP_CMD,
+            ], check=True, capture_output=True)
+            wait_ready(slot)
+        except (subprocess.CalledProcessError, RuntimeError) as e:
+            print(f"[pool] failed to boot {slot}: {e}")
+            self._remove(slot)
+            with self._lock:
+                self._booting -= 1
+            return
+        with self._lock:
+            self._booting -= 1
+            self._ready.append(slot)
+
+    def _remove(self, slot: str):
+        subprocess.run(["docker", "rm", "-f", slot], capture_output=True)
+        # only unclaimed slots are removed here — their dir never received a workspace
+        shutil.rmtree(POOL_ROOT / slot, ignore_errors=True)
+
+
+pool = ContainerPool()
 
 
 class Container:
     """Controls a docker container with xvfb inside."""
 
-    def __init__(self, name: str, image: str = "intvrface_sandbox", novnc_port: int = 6080):
+    def __init__(self, name: str, image: str = "intvrface_sandbox", novnc_port: int = 6080,
+                 paste_threshold: int | None = PASTE_THRESHOLD):
         self.name = name
-        self.image = image # name for the docker template
+        self.image = image # name for the docker template. tagged with the Dockerfile content hash
         self.novnc_port = novnc_port  # browser connects to localhost:novnc_port/vnc.html
         self.workspace = WORKSPACE_ROOT / name
         self._running = False
-
-    def build(self):
-        """Build the docker image. Stores Dockerfile to detect changes."""
-        build_dir = Path.home() / "intvrface" / "docker_build"
-        build_dir.mkdir(parents=True, exist_ok=True)
-        (build_dir / "Dockerfile").write_text(DOCKERFILE)
-
-        print("Building docker image...")
-        # running a command in a new process and waits for it to finish
-        subprocess.run(
-            ["docker", "build", "-t", self.image, str(build_dir)], #Docker hardcoded to look for 'Dockerfile' in path provided
-            check=True, # if fail raise exception
-        )
-        # store copy so we know when Dockerfile changes
-        (build_dir / "last_build").write_text(DOCKERFILE)
-        print(f"Image '{self.image}' built.")
-
-    def _needs_rebuild(self) -> bool:
-        """Check if image is missing or Dockerfile changed since last build."""
-
-        # see if any images built with the same image name return hex IDs
-        result = subprocess.run(
-            ["docker", "images", "-q", self.image],
-            capture_output=True, text=True
-        )
-        # if no hex IDs returned, rebuild 
-        if not result.stdout.strip():
-            return True
-        # if no dockerfile string stored, rebuild
-        last_build = Path.home() / "intvrface" / "docker_build" / "last_build"
-        if not last_build.exists():
-            return True
-        # if the dockerfile is changed in this code file, rebuild
-        return last_build.read_text() != DOCKERFILE
-
-    def _cleanup_all_containers(self):
-        """Remove all containers using this image (for rebuild)."""
-        result = subprocess.run(
-            ["docker", "ps", "-a", "-q", "--filter", f"ancestor={self.image}"],
-            capture_output=True, text=True
-        )
-        for cid in result.stdout.strip().split('\n'):
-            if cid:
-                subprocess.run(["docker", "rm", "-f", cid], capture_output=True)
+        # type_text pastes above this many chars. None: always type
+        self.paste_threshold = paste_threshold
+        # docker paused (cgroup frozen): processes stopped, memory kept. exec is impossible until thawed
+        self.frozen = False
 
     def start(self):
-        """Start the container. Auto-rebuilds image if Dockerfile changed."""
-        if self._needs_rebuild():
-            # nuke old containers using this image — they're stale
-            print("Dockerfile changed or image missing, rebuilding...", flush=True)
-            self._cleanup_all_containers()
-            subprocess.run(["docker", "rmi", self.image], capture_output=True)
-            self.build()
+        """Start the container. Builds the image if Dockerfile changed. Claims a warm pool container if available."""
+        tag = ensure_image(self.image)
 
         # always remove old container and recreate cause startup processes don't survive docker stop/start
         # rm: remove container. f: force (stop first if running, no error if doesn't exist)
         subprocess.run(["docker", "rm", "-f", self.name], capture_output=True)
-
-        print(f"Creating container '{self.name}'...", flush=True)
+        self.frozen = False
+        # workspace may still be lent to the slot of a previous pooled container
+        self._release_workspace()
         self.workspace.mkdir(parents=True, exist_ok=True)
-        subprocess.run([
-            # run: create and start a docker container; d: detached (background). don't block terminal
-            "docker", "run", "-d", "--name", self.name,
-            "-p", f"{self.novnc_port}:6080",
-            # v: volume. mount host directory into container as shared folder
-            "-v", f"{self.workspace.absolute()}:/home/agent",
-            self.image,
-            "bash", "-c", STARTUP_CMD,
-        ], check=True)
-
-        # wait for xvfb to be ready
-        while True:
-            result = self.run("xdotool getdisplaygeometry")
-            if "1280" in result:
-                break
-            time.sleep(0.5)
+
+        slot = pool.claim() if pool.size else None
+        if slot:
+            print(f"Claiming pooled container '{slot}' for '{self.name}'...", flush=True)
+            self._adopt(slot)
+        else:
+            print(f"Creating container '{self.name}'...", flush=True)
+            subprocess.run([
+                # run: create and start a docker container; d: detached (background). don't block terminal
+                "docker", "run", "-d", "--name", self.name,
+                *LIMIT_ARGS,
+                "-p", f"{self.novnc_port}:6080",
+                # v: volume. mount host directory into container as shared folder
+                "-v", f"{self.workspace.absolute()}:/home/agent",
+                tag,
+                "bash", "-c", STARTUP_CMD,
+            ], check=True)
+            # wait for xvfb + window manager to be ready
+            wait_ready(self.name)
+
         # wait for xterm to spawn then focus it once
+        # search --sync blocks inside the container until the window exists — one exec instead of a polling loop
         # windowfocus works without a WM (windowactivate doesn't)
-        while True:
-            result = self.run("xdotool search --class XTerm")
-            if result.strip():
-                wid = result.strip().split('\n')[0]
-                #wid: window id; sync: wait till focus happens before returning
-                self.run(f"xdotool windowfocus --sync {wid}")
-                break
-            time.sleep(0.5)
+        result = self.run("xdotool search --sync --class XTerm")
+        wid = result.strip().split('\n')[0]
+        #wid: window id; sync: wait till focus happens before returning
+        self.run(f"xdotool windowfocus --sync {wid}")
         self._running = True
         print(f"Container running. Workspace: {self.workspace}")
 
+    def _adopt(self, slot: str):
+        """Bind a booted pool container to this agent: workspace, name, xterm, noVNC port."""
+        slot_home = POOL_ROOT / slot / "home"
+        # the container sees it as /mnt/slot/home == /home/agent
+        self.workspace.rename(slot_home)
+        self.workspace.symlink_to(slot_home.absolute())
+        subprocess.run(["docker", "rename", slot, self.name], check=True)
+        # d: detached. xterm outlives the exec
+        subprocess.run(["docker", "exec", "-d", self.name, "bash", "-c", XTERM_CMD], check=True)
+        # docker port prints e.g. "0.0.0.0:49153\n[::]:49153"
+        result = subprocess.run(["docker", "port", self.name, "6080"], capture_output=True, text=True)
+        self.novnc_port = int(result.stdout.split('\n')[0].rsplit(':', 1)[1])
+
+    def _release_workspace(self):
+        """Move a workspace lent to a pool slot back to workspace/{name}."""
+        if not self.workspace.is_symlink():
+            return
+        slot_home = self.workspace.resolve()
+        self.workspace.unlink()
+        if slot_home.exists():
+            slot_home.rename(self.workspace)
+        shutil.rmtree(slot_home.parent, ignore_errors=True)
+
+    def freeze(self):
+        """docker pause: freeze every process in the container so an idle agent burns no CPU."""
+        if self._running and not self.frozen:
+            subprocess.run(["docker", "pause", self.name], capture_output=True)
+            self.frozen = True
+
+    def thaw(self):
+        """docker unpause: resume a frozen container."""
+        if self.frozen:
+            subprocess.run(["docker", "unpause", self.name], capture_output=True)
+            self.frozen = False
 
     def stop(self):
         """Stop the container (preserves state, can resume later)."""
+        self.thaw()
         subprocess.run(["docker", "stop", self.name], capture_output=True)
         self._running = False
         print("Container stopped (state preserved).")
 
     def destroy(self):
         """Stop AND remove the container, workspace, and context."""
+        self.thaw()
         # clean root-owned workspace files via a temporary container
         # since it's created by docker as root, python can't just delete it
         if self.workspace.exists():
             subprocess.run([
                 "docker", "run", "--rm",
-                "-v", f"{self.workspace.absolute()}:/cleanup",
+                # resolve: workspace may be a symlink into a pool slot
+                "-v", f"{self.workspace.resolve()}:/cleanup",
                 "ubuntu:22.04", "rm", "-rf", "/cleanup"
             ], capture_output=True)
         subprocess.run(["docker", "stop", self.name], capture_output=True)
         subprocess.run(["docker", "rm", self.name], capture_output=True)
         self._running = False
+        self._release_workspace()
         # delete the directory itself
         if self.workspace.exists():
             shutil.rmtree(self.workspace)
@@ -215,29 +529,101 @@ class Container:
 
     def run(self, cmd: str) -> str:
         """Run a shell command inside the container, return output."""
-        result = subprocess.run(
-            ["docker", "exec", self.name, "bash", "-c", cmd],
-            capture_output=True, text=True,
-        )
+        with tracing.span("exec", "container", cmd=cmd[:200]):
+            result = subprocess.run(
+                ["docker", "exec", self.name, "bash", "-c", cmd],
+                capture_output=True, text=True,
+            )
         return result.stdout + result.stderr
 
+    def host_path(self, path: str) -> Path | None:
+        """Host-side path for a container path under /home/agent (the bind mount), else None."""
+        # normpath collapses .. so /home/agent/../etc doesn't count as inside
+        norm = posixpath.normpath(path)
+        if norm != AGENT_HOME and not norm.startswith(AGENT_HOME + "/"):
+            return None
+        root = self.workspace.resolve()
+        host = (root / posixpath.relpath(norm, AGENT_HOME)).resolve()
+        # symlinks inside the workspace can point anywhere on the host — only follow ones that stay inside
+        return host if host.is_relative_to(root) else None
+
     def read_file(self, path: str) -> str:
-        """Read a file inside the container. No shell involved."""
-        result = subprocess.run(
-            ["docker", "exec", self.name, "cat", path],
-            capture_output=True, text=True,
-        )
+        """Read a file inside the container. Direct host read for the mounted workspace, cat otherwise."""
+        host = self.host_path(path)
+        if host:
+            try:
+                return host.read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                pass  # missing or root-only file — let cat produce the usual error message
+        with tracing.span("exec cat", "container", path=path):
+            result = subprocess.run(
+                ["docker", "exec", self.name, "cat", path],
+                capture_output=True, text=True,
+            )
         return result.stdout + result.stderr
 
+    def read_lines(self, path: str, start: int, end: int | None) -> list[str]:
+        """Lines [start, end) of a file, 0-indexed. Streamed on the host so big files aren't loaded whole."""
+        start, end = max(start, 0), None if end is None else max(end, 0)
+        host = self.host_path(path)
+        if host:
+            try:
+                with open(host, encoding="utf-8", errors="replace") as f:
+                    return [line.rstrip('\n') for line in itertools.islice(f, start, end)]
+            except OSError:
+                pass
+        return self.read_file(path).split('\n')[start:end]
+
     def write_file(self, path: str, content: str):
-        """Write content to a file inside the container via stdin. No shell escaping needed."""
+        """Write content to a file inside the container. Direct atomic host write for the mounted workspace."""
+        host = self.host_path(path)
+        if host:
+            try:
+                self._write_host(host, content)
+                return
+            except OSError:
+                pass  # e.g. root-owned dir created inside the container — exec as root instead
         self.run(f"mkdir -p $(dirname '{path}')")
-        subprocess.run(
-            # -i: keeps stdin interactive; tee: reads from stdin writes to a file
-            ["docker", "exec", "-i", self.name, "tee", path],
-            input=content,
-            # text = True: input and output are strings. otherwise expects bytes
-            capture_output=True, text=True,
+        with tracing.span("exec tee", "container", path=path, chars=len(content)):
+            subprocess.run(
+                # -i: keeps stdin interactive; tee: reads from stdin writes to a file
+                ["docker", "exec", "-i", self.name, "tee", path],
+                input=content,
+                # text = True: input and output are strings. otherwise expects bytes
+                capture_output=True, text=True,
+            )
+
+    def _write_host(self, host: Path, content: str):
+        """Write via temp file + rename so the container never sees a half-written file."""
+        host.parent.mkdir(parents=True, exist_ok=True)
+        # keep the existing file's permissions (mkstemp creates 0600)
+        mode = stat.S_IMODE(host.stat().st_mode) if host.exists() else 0o644
+        fd, tmp = tempfile.mkstemp(dir=host.parent, prefix=f".{host.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.chmod(tmp, mode)
+            os.replace(tmp, host)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def rotate_term_log(self):
+        """
+        Move term.log's contents to term.log.1. Runs in the container — the log is root-owned.
+        Only the copied bytes are cut from the front (fallocate collapse-range, whole filesystem
+        blocks), so output written during the rotation stays in term.log. Filesystems without
+        collapse-range fall back to copy + truncate, which can lose what lands in between.
+        The running total of bytes cut goes to term.log.cut, so readers resume where they were
+        (terminal.log_span) instead of re-reading what is left of the file.
+        """
+        self.run(
+            "cd /home/agent && S=$(stat -c %s term.log) && B=$(stat -f -c %S term.log) && N=$((S - S % B)) && "
+            "C=$(cat term.log.cut 2>/dev/null || echo 0) && "
+            "if [ $N -gt 0 ] && head -c $N term.log > term.log.1 && fallocate --collapse-range -o 0 -l $N term.log; then :; "
+            "else cp term.log term.log.1 && N=$(stat -c %s term.log) && truncate -s 0 term.log; fi && "
+            # written after the cut — a reader that saw the old total in between retries (log_span)
+            "echo $((C + N)) > term.log.cut.tmp && mv term.log.cut.tmp term.log.cut"
         )
 
     def screenshot(self) -> Path:
@@ -258,8 +644,43 @@ class Container:
             "-draw \"line $X,$((Y-12)) $X,$((Y+12))\" "
             "png:/home/agent/screenshots/screen.png"
         )
+        return self.screen_path
+
+    @property
+    def screen_path(self) -> Path:
+        """Latest screenshot() frame."""
         return self.workspace / "screenshots" / "screen.png"
 
+    def thumbnail(self, from_screen: bool = False) -> Path:
+        """
+        Make the dashboard thumbnail. Returns its path in the workspace.
+            from_screen=False   fresh capture (no cursor marker)
+            from_screen=True    downscale the last screenshot() frame — no capture
+        """
+        source = "/home/agent/screenshots/screen.png" if from_screen else "xwd:-"
+        capture = "" if from_screen else "xwd -root -silent | "
+        self.run(f"mkdir -p /home/agent/screenshots && {capture}convert {source} {THUMB_CMD}")
+        return self.thumb_path
+
+    @property
+    def thumb_path(self) -> Path:
+        """Latest dashboard thumbnail, written by thumbnail()."""
+        return self.workspace / "screenshots" / "thumb.jpg"
+
+    def frame_hash(self) -> str:
+        """Hash of the current framebuffer. Cheap change detection — no image leaves the container."""
+        return self.run("xwd -root -silent | md5sum").split(' ')[0]
+
+    def a11y_tree(self) -> str:
+        """Accessibility tree of the focused window as compact text. Empty if the window exposes none (e.g. xterm)."""
+        with tracing.span("exec a11y", "container"):
+            result = subprocess.run(
+                # timeout: a hung app can block at-spi queries
+                ["docker", "exec", "-i", self.name, "bash", "-c", f". {DBUS_ENV}; timeout 10 python3 -"],
+                input=A11Y_SCRIPT, capture_output=True, text=True,
+            )
+        return result.stdout.strip()
+
     def click(self, button: int = 1):
         """Click mouse button. 1=left, 3=right."""
         self.run(f"xdotool click {button}")
@@ -283,12 +704,36 @@ class Container:
 
 
     def type_text(self, text: str):
-        """Type text on keyboard."""
+        """Type text on keyboard. Long text is pasted instead (see paste_text)."""
+        if self.paste_threshold is not None and len(text) > self.paste_threshold:
+            self.paste_text(text)
+            return
         # list command here to not go through bash
-        subprocess.run(
-            ["docker", "exec", self.name, "xdotool", "type", text],
-            capture_output=True,
-        )
+        with tracing.span("exec type", "container", chars=len(text)):
+            subprocess.run(
+                ["docker", "exec", self.name, "xdotool", "type", text],
+                capture_output=True,
+            )
+
+    def paste_text(self, text: str):
+        """Put text on the clipboard + primary selection and paste it into the focused window, in one exec."""
+        # bracketed paste (bash, vim) inserts a trailing newline without running it — press Return separately like typing would
+        body, enter = (text[:-1], True) if text.endswith('\n') else (text, False)
+        with tracing.span("exec paste", "container", chars=len(text)):
+            subprocess.run(
+                ["docker", "exec", "-i", self.name, "bash", "-c",
+                 # xclip forks to keep serving the selection — detach its stdio so docker exec returns
+                 "cat > /tmp/paste && "
+                 "xclip -selection clipboard -i /tmp/paste >/dev/null 2>&1 && "
+                 "xclip -selection primary -i /tmp/paste >/dev/null 2>&1 && "
+                 # xterm pastes PRIMARY on shift+Insert, everything else (chromium, gtk) pastes CLIPBOARD on ctrl+v
+                 'if [ "$(xdotool getactivewindow getwindowclassname)" = XTerm ]; '
+                 "then xdotool key shift+Insert; else xdotool key ctrl+v; fi"
+                 # the app fetches the selection asynchronously — give it a moment before Return so it lands after the text
+                 + ("; sleep 0.2; xdotool key Return" if enter else "")],
+                input=body.encode(),
+                capture_output=True,
+            )
 
     def key(self, combo: str):
         """Press a key combo. e.g. 'Return', 'ctrl+c', 'alt+Tab'."""
@@ -1,19 +1,32 @@
 import json
 import base64
-import torch
+import contextvars
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+import metrics
+import tracing
+from model import KVCache
+from archive import Archive
 from prompt import WORK_MSG
 
-# outer tuple: one entry per layer (...  means repeat N layers)
-# inner tuple: (key_tensor, value_tensor) for that layer
-# each tensor shape: (batch, heads, seq_len, head_dim)
-# None for API models that don't expose kv cache
-KVCache = tuple[tuple[torch.Tensor, torch.Tensor], ...] | None
-
 
 CONTEXT_ROOT = Path.home() / "intvrface" / "context"
 MAX_WORDS = 64000
 PRESERVE_LAST = 5
+# words an image counts as toward MAX_WORDS
+IMAGE_WORDS = 1000
+
+
+def count_words(msg: dict) -> int:
+    """Words a message counts as toward MAX_WORDS."""
+    total = 0
+    for block in msg.get("content", []):
+        if block.get("type") == "text":
+            total += len(block.get("text", "").split())
+        elif block.get("type") == "image":
+            total += IMAGE_WORDS  # a picture is worth a thousand words
+    return total
+
 
 class Context:
     """
@@ -22,8 +35,13 @@ class Context:
     Messages are stored uncollapsed — each add() creates a new entry.
     Only marshal() collapses consecutive same-role messages for the API.
 
+    messages is updated immediately; disk writes (archive, working.jsonl, kv_cache.pt) are
+    queued on one background thread per context and run in the order they were made.
+    flush() waits for them. A failed write is raised by the next flush() or check(); close()
+    stops the thread.
+
     Files in context/{name}/:
-        original.jsonl   - full log, append-only archive (never read at runtime)
+        archive/         - full log, append-only gzip segments + index (never read at runtime, see archive.py)
         working.jsonl    - current working memory (loaded on startup)
         kv_cache.pt      - cached key/values for local models
     """
@@ -33,13 +51,26 @@ class Context:
         self.folder = CONTEXT_ROOT / name
         self.folder.mkdir(parents=True, exist_ok=True)
 
-        self.original_path = self.folder / "original.jsonl"
+        self.archive = Archive(self.folder)
+        # agents from before the archive still have an original.jsonl. AgentHost.load converts
+        # them in a thread at startup — this only catches contexts opened some other way (bench)
+        self.archive.migrate()
         self.working_path = self.folder / "working.jsonl"
         self.kv_path = self.folder / "kv_cache.pt"
 
-        self.original_path.touch(exist_ok=True)
         self.working_path.touch(exist_ok=True)
         self.messages: list[dict] = [json.loads(line) for line in self.working_path.read_text().strip().splitlines()]
+        # running total for needs_summary, instead of recounting every message each turn
+        self.words = sum(count_words(msg) for msg in self.messages)
+
+        # one thread: writes land in submission order (a summary rewrite never overtakes an append)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"context-{name}")
+        self._last_write: Future | None = None
+        # first write failure not yet raised by flush()/check()
+        self._write_error: Exception | None = None
+        # newest kv cache waiting for its save — only the latest one is worth writing
+        self._kv_pending: KVCache = None
+        self._kv_queued = False
 
     def marshal(self) -> list[dict]:
         """
@@ -77,7 +108,8 @@ class Context:
             # original: 0-255 (8 bit as a unit)
             # base64: 6 bit as a unit mappable to ASCII character then to its 8 bit code
             # utf8: typecasts the byte data to string, actual data stays the same
-            img_data = base64.standard_b64encode(image_bytes).decode("utf-8")
+            with metrics.timer("intvrface_image_encode_seconds", agent=self.name):
+                img_data = base64.standard_b64encode(image_bytes).decode("utf-8")
             block = {
                 "type": "image",
                 "source": {"type": "base64", "media_type": "image/png", "data": img_data}
@@ -88,24 +120,50 @@ class Context:
 
         msg = {"role": role, "content": [block]}
         self.messages.append(msg)
-        with open(self.original_path, "a") as f:
-            f.write(json.dumps(msg) + "\n")
-        with open(self.working_path, "a") as f:
-            f.write(json.dumps(msg) + "\n")
-
-
+        self.words += count_words(msg)
+        # messages are never modified after add, so the writer can serialize this one later
+        self._submit(self._append, msg)
+
+    def _append(self, msg: dict):
+        with tracing.span("context add", "context", role=msg["role"]), \
+                metrics.timer("intvrface_context_write_seconds", agent=self.name):
+            line = json.dumps(msg) + "\n"
+            self.archive.append(line, msg["role"])
+            with open(self.working_path, "a") as f:
+                f.write(line)
+
+    def _submit(self, fn, *args):
+        """Queue a write. The caller's contextvars go along, so its spans land in the running turn's trace."""
+        self._last_write = self._writer.submit(contextvars.copy_context().run, self._run_write, fn, *args)
+
+    def _run_write(self, fn, *args):
+        # nobody waits on these futures — kept for check(), so a full disk doesn't lose messages silently
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"[context] {self.name} write failed: {e}")
+            if self._write_error is None:
+                self._write_error = e
+
+    def check(self):
+        """Raise the first write failure since the last check, if any. Doesn't wait for queued writes."""
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def flush(self):
+        """Block until every write queued so far is on disk. Raises a write failure like check()."""
+        if self._last_write is not None:
+            self._last_write.result()
+        self.check()
+
+    def close(self):
+        """Finish queued writes and stop the writer thread. The context can't be written after this."""
+        self._writer.shutdown(wait=True)
 
     def needs_summary(self) -> bool:
-        """Count words in streaming context."""
         """Check if context exceeds MAX_WORDS."""
-        total = 0
-        for msg in self.messages:
-            for block in msg.get("content", []):
-                if block.get("type") == "text":
-                    total += len(block.get("text", "").split())
-                elif block.get("type") == "image":
-                    total += 1000  # a picture is worth a thousand words
-        return total >= MAX_WORDS
+        return self.words >= MAX_WORDS
 
     def apply_summary(self, summary: str):
         """Replace working memory with summary + last N messages."""
@@ -114,25 +172,45 @@ class Context:
 
         summary_msg = {"role": "assistant", "content": [{"type": "text", "text": f"SUMMARIZED CONTEXT: {summary}"}]}
 
-        # archive summary to original
-        with open(self.original_path, "a") as f:
-            f.write(json.dumps(summary_msg) + "\n")
-
         # rebuild in-memory: summary + last N
         self.messages = [summary_msg] + self.messages[-PRESERVE_LAST:]
+        self.words = sum(count_words(msg) for msg in self.messages)
+        # copy: adds after this one are appended to working.jsonl by their own writes
+        self._submit(self._rewrite, summary_msg, list(self.messages))
 
-        # overwrite working.jsonl
-        self.working_path.write_text(
-            '\n'.join(json.dumps(msg) for msg in self.messages) + '\n'
-        )
+    def _rewrite(self, summary_msg: dict, messages: list[dict]):
+        with tracing.span("apply summary", "context"), metrics.timer("intvrface_context_write_seconds", agent=self.name):
+            # archive summary to original
+            self.archive.append(json.dumps(summary_msg) + "\n", "assistant")
+
+            # overwrite working.jsonl
+            self.working_path.write_text(
+                '\n'.join(json.dumps(msg) for msg in messages) + '\n'
+            )
 
     def load_kv(self) -> KVCache:
+        # a save may still be queued
+        self.flush()
         if self.kv_path.exists():
+            # imported here so API-only agents (no kv_cache.pt ever written) never load torch
+            import torch
             return torch.load(self.kv_path)
         return None
 
     def save_kv(self, kv: KVCache):
-        if kv is None:
-            self.kv_path.unlink(missing_ok=True)
-        else:
-            torch.save(kv, self.kv_path)
+        """Queue a kv cache save. If one is still queued it writes this cache instead — no backlog of stale saves."""
+        self._kv_pending = kv
+        if not self._kv_queued:
+            self._kv_queued = True
+            self._submit(self._save_kv)
+
+    def _save_kv(self):
+        # cleared before reading: a save_kv() from here on queues another write rather than being lost
+        self._kv_queued = False
+        kv = self._kv_pending
+        with tracing.span("save kv", "context"), metrics.timer("intvrface_context_write_seconds", agent=self.name):
+            if kv is None:
+                self.kv_path.unlink(missing_ok=True)
+            else:
+                import torch
+                torch.save(kv, self.kv_path)
@@ -0,0 +1,476 @@
+"""
+Agent management for one process: the agents, their work loops, container start/freeze,
+and the websocket commands that act on agents.
+
+server.py runs one AgentHost in-process (WORKERS = 0), or one per worker process
+(worker.py) that owns the agents whose name hashes to it (shard_of). A host never
+touches websockets — it reports through two callbacks:
+    send(msg, client)        message for one client (id from server.py), all clients (None),
+                             or dashboard subscribers (DASHBOARD)
+    changed(info, configs)   its agents' status or persisted config changed
+
+Usage:
+    host = AgentHost(send, changed)
+    host.load({"agent_1": {"novnc_port": 6080, "gui_feedback": "look"}})
+    asyncio.create_task(host.thumb_loop())
+    await host.handle({"cmd": "start", "name": "agent_1"}, client=3)
+    await host.handle({"cmd": "term", "name": "agent_1", "enabled": True}, client=3)   # live term_delta stream
+"""
+
+import zlib
+import time
+import base64
+import asyncio
+from typing import Awaitable, Callable
+
+import metrics
+from agent import Agent
+from archive import Archive
+from context import CONTEXT_ROOT
+from container import running_containers
+from models.claude import Claude
+from terminal import LiveTerm
+from watch import DirWatch
+
+# containers booting at once during start_all
+MAX_PARALLEL_STARTS = 4
+# pause/chat mode: seconds the running command gets to finish before the turn is cancelled outright
+PREEMPT_GRACE = 2.0
+# send() target: clients in dashboard mode
+DASHBOARD = -1
+# seconds between dashboard thumbnail checks
+THUMB_INTERVAL = 2.0
+# a working agent whose last screenshot is older than this is captured like an idle one (it works in XTerm, say)
+THUMB_STALE = 3 * THUMB_INTERVAL
+# live terminal: at most one term_delta per agent per this many seconds — output in between is coalesced
+TERM_INTERVAL = 0.1
+# re-check term.log this often even without an inotify event (a pooled container's workspace is swapped in)
+TERM_IDLE = 5.0
+
+Send = Callable[[dict, int | None], Awaitable[None]]
+Changed = Callable[[dict, dict], Awaitable[None]]
+
+
+def shard_of(name: str, shards: int) -> int:
+    """Which of `shards` hosts owns an agent. crc32, not hash() — must agree across processes."""
+    return zlib.crc32(name.encode()) % shards
+
+
+class AgentHost:
+    """Owns a set of agents and runs the commands for them."""
+
+    def __init__(self, send: Send, changed: Changed):
+        # active agents: name -> {"agent": Agent, "novnc_port": int, "container_on": bool, "working": bool, "lock": asyncio.Lock}
+        self.agents: dict[str, dict] = {}
+        self.send = send
+        self.changed = changed
+        # dashboard clients connected (server.py keeps count) — thumbnails only flow while > 0
+        self.watchers = 0
+        # agent name -> mtime_ns of the last thumbnail sent
+        self._thumbs_sent: dict[str, int] = {}
+        # agent name -> mtime_ns of the screenshot its thumbnail was last made from
+        self._screens_thumbed: dict[str, int] = {}
+        # live terminal streams: agent name -> {"subs": client ids, "view": LiveTerm, "lock": Lock, "task": term_loop}
+        self.terms: dict[str, dict] = {}
+
+    def load(self, configs: dict[str, dict]):
+        """
+        Build agents from saved configs. Agents hydrate their context lazily on first use.
+        Blocking (callers run it in a thread) — legacy original.jsonl files are converted here,
+        not on the event loop when the context is first touched.
+        """
+        # check actual docker state — containers may still be running from last session
+        # one docker ps for all agents instead of one per agent
+        running = running_containers() if configs else {}
+        for name, cfg in configs.items():
+            # a multi-GB log of inline screenshots takes a while; a no-op once migrated
+            try:
+                Archive(CONTEXT_ROOT / name).migrate()
+            except Exception as e:
+                # one unreadable log mustn't keep the other agents from loading
+                print(f"[load] {name} context migration failed: {e}")
+            novnc_port = cfg["novnc_port"]
+            model = Claude()
+            agent = Agent(name, model, use_container=True, novnc_port=novnc_port, gui_feedback=cfg.get("gui_feedback", "look"))
+            container_on = name in running
+            if container_on:
+                agent.container._running = True
+                # paused agents from last session stay frozen until started
+                agent.container.frozen = running[name] == "paused"
+            self.agents[name] = {"agent": agent, "novnc_port": novnc_port, "container_on": container_on, "working": False,
+                                 "lock": asyncio.Lock()}
+
+    # returns everything in agents except the agent objects for the frontend
+    def info(self) -> dict:
+        return {name: {"container_on": info["container_on"], "working": info["working"], "novnc_port": info["novnc_port"],
+                       "frozen": bool(info["agent"].container and info["agent"].container.frozen),
+                       "gui_feedback": info["agent"].gui_feedback} for name, info in self.agents.items()}
+
+    # only config is persisted (novnc_port, gui_feedback). runtime state is reconstructed on startup
+    def configs(self) -> dict:
+        return {name: {"novnc_port": info["novnc_port"], "gui_feedback": info["agent"].gui_feedback}
+                for name, info in self.agents.items()}
+
+    async def notify(self):
+        """Report agent status/config — server.py saves agents.json and broadcasts the agent list."""
+        await self.changed(self.info(), self.configs())
+
+    async def error(self, client: int | None, text: str):
+        await self.send({"type": "error", "msg": text}, client)
+
+    async def freeze(self, info: dict):
+        """Freeze an idle agent's container (paused or chat mode) — no CPU for xvfb, chromium, x11vnc."""
+        if info["agent"].container:
+            await asyncio.to_thread(info["agent"].container.freeze)
+
+    async def thaw(self, info: dict):
+        """Resume a frozen container before the agent acts on it again."""
+        if info["agent"].container:
+            await asyncio.to_thread(info["agent"].container.thaw)
+
+    async def send_context(self, name: str, agent: Agent):
+        with agent.tracer.span("broadcast", "server"):
+            await self.send({"type": "context", "name": name, "messages": agent.context.messages}, None)
+        agent.tracer.flush()
+
+    def push_context(self, name: str, info: dict):
+        """
+        Broadcast the agent's context in the background — the caller (next turn) doesn't wait.
+        One send per agent in flight: calls meanwhile only mark the context stale, and a
+        single send with the newest messages follows. Clients see contexts in order.
+        """
+        info["context_stale"] = True
+        if info.get("pusher") is None or info["pusher"].done():
+            info["pusher"] = asyncio.create_task(self._push_context(name, info))
+
+    async def _push_context(self, name: str, info: dict):
+        while info.pop("context_stale", False):
+            try:
+                await self.send_context(name, info["agent"])
+            except Exception as e:
+                print(f"[push_context] {name} error: {e}")
+
+    async def work_loop(self, name: str, info: dict):
+        # loops agent.turn() until info["working"] is set to False
+        agent = info["agent"]
+        if not agent.context.messages:
+            agent.context.add("user", content="start working")
+        while info["working"]:
+            try:
+                await agent.turn()
+                # next model call goes out right away, the broadcast overlaps it
+                self.push_context(name, info)
+            except asyncio.CancelledError:
+                # paused mid-turn: what the turn added so far is still shown (and written by the context's writer)
+                self.push_context(name, info)
+                break
+            except asyncio.TimeoutError:
+                print(f"[work_loop] {name} API TIMEOUT — retrying in 5s")
+                await asyncio.sleep(5)
+            except Exception as e:
+                print(f"[work_loop] {name} error: {e}")
+                await asyncio.sleep(5)
+
+    async def start_agent(self, name: str):
+        """Bring up an agent's container (if off) and its work loop."""
+        info = self.agents[name]
+        async with info["lock"]:
+            if self.agents.get(name) is info:
+                # not deleted while waiting for the lock
+                await self._start_agent(name, info)
+
+    async def _start_agent(self, name: str, info: dict):
+        # container.start() has blocking subprocess.run() calls — can't run on main thread or event loop freezes
+        # to_thread spawns a separate OS thread so the main thread keeps processing websockets/tasks
+        #
+        # kernel
+        # ├── python process
+        # │   ├── OS thread 1 (main) ← event loop, websockets, asyncio tasks (switch at await)
+        # │   └── OS thread 2 (to_thread) ← blocked waiting on subprocess.run
+        # ├── docker process (spawned by subprocess.run, not under any thread)
+        # └── ...
+        #
+        # await (asyncio tasks): non-blocking for external I/O (network, API calls). shares one thread, switches at await
+        # threading (to_thread): non-blocking for non-python blocking code (subprocess, C calls, GPU). GIL blocks python-on-python
+        # multiprocessing: truly parallel python. separate processes, separate GILs, but no shared memory (see worker.py)
+        if not info["container_on"]:
+            agent = info["agent"]
+            if agent.container and not agent.container._running:
+                # GIL in python means only one thread within a process can execute python code at one time, however container.start calls OS to spawn subprocess blocking code which is a different thread
+                await asyncio.to_thread(agent.container.start)
+                # a pooled container comes with its own noVNC port
+                if agent.container.novnc_port != info["novnc_port"]:
+                    info["novnc_port"] = agent.container.novnc_port
+            info["container_on"] = True
+        await self.thaw(info)
+
+        # start work loop if not working
+        if not info["working"]:
+            info["working"] = True
+            info["work_loop"] = asyncio.create_task(self.work_loop(name, info))
+
+        await self.notify()
+
+    async def start_agents(self, names: list[str]):
+        """Start several agents concurrently, at most MAX_PARALLEL_STARTS containers booting at once."""
+        # bounds concurrent docker run + readiness waits so a big batch doesn't swamp the docker daemon
+        sem = asyncio.Semaphore(MAX_PARALLEL_STARTS)
+
+        async def start_one(name: str):
+            async with sem:
+                try:
+                    await self.start_agent(name)
+                except Exception as e:
+                    print(f"[start_all] {name} failed: {e}")
+                    await self.error(None, f"agent {name} failed to start: {e}")
+
+        await asyncio.gather(*(start_one(name) for name in names))
+
+    async def thumb_loop(self):
+        """
+        Push changed thumbnails of every running agent to dashboard clients, every THUMB_INTERVAL.
+        Working agents are not captured — their thumbnail is downscaled from the last LOOK/auto-feedback
+        screenshot, once per new frame — unless that is older than THUMB_STALE: an agent in XTerm gets
+        TERM feedback and takes none. Idle (paused/chat) agents get a fresh capture. Frozen containers
+        can't be exec'd into and don't change, so they are skipped. Nothing runs without watchers,
+        and screenshots on the turn path never pay for thumbnails.
+        """
+        while True:
+            await asyncio.sleep(THUMB_INTERVAL)
+            if not self.watchers:
+                continue
+            for name, info in list(self.agents.items()):
+                container = info["agent"].container
+                if not container or not info["container_on"] or container.frozen:
+                    continue
+                try:
+                    try:
+                        screen = container.screen_path.stat().st_mtime_ns
+                    except FileNotFoundError:
+                        screen = 0
+                    if not info["working"] or time.time_ns() - screen > THUMB_STALE * 1e9:
+                        await asyncio.to_thread(container.thumbnail)
+                    elif self._screens_thumbed.get(name) != screen:
+                        await asyncio.to_thread(container.thumbnail, True)
+                        self._screens_thumbed[name] = screen
+                    path = container.thumb_path
+                    mtime = path.stat().st_mtime_ns
+                    if self._thumbs_sent.get(name) == mtime:
+                        continue
+                    data = base64.standard_b64encode(path.read_bytes()).decode("utf-8")
+                except OSError:
+                    # no frame captured yet
+                    continue
+                self._thumbs_sent[name] = mtime
+                await self.send({"type": "thumb", "name": name, "data": data}, DASHBOARD)
+
+    async def subscribe_term(self, name: str, client: int | None, enabled: bool):
+        """Start/stop streaming an agent's terminal to a client. A new subscriber first gets the whole current view."""
+        term = self.terms.get(name)
+        if not enabled:
+            if term:
+                term["subs"].discard(client)
+                if not term["subs"]:
+                    self.stop_term(name)
+            return
+        if term is None:
+            term = self.terms[name] = {"subs": set(), "view": LiveTerm(self.agents[name]["agent"].term.path),
+                                       "lock": asyncio.Lock()}
+            term["task"] = asyncio.create_task(self.term_loop(name, term))
+        # under the lock: the snapshot and the deltas after it reach this client in order
+        # (a new stream's snapshot is empty — term_loop's first read follows as a delta)
+        async with term["lock"]:
+            term["subs"].add(client)
+            await self.send({"type": "term_delta", "name": name, "keep": 0, "text": term["view"].text}, client)
+
+    async def term_loop(self, name: str, term: dict):
+        """Send term.log changes to the agent's subscribers as term_delta, waking on inotify events."""
+        view = term["view"]
+        while True:
+            # watch first, then read — a write between the two still wakes us
+            with DirWatch(view.path.parent) as w:
+                async with term["lock"]:
+                    delta = await asyncio.to_thread(view.update)
+                    if delta is not None:
+                        keep, text = delta
+                        msg = {"type": "term_delta", "name": name, "keep": keep, "text": text}
+                        for client in list(term["subs"]):
+                            await self.send(msg, client)
+                if delta is None:
+                    await w.wait(TERM_IDLE)
+                    continue
+            # rate limit: whatever is written meanwhile goes out as one delta
+            await asyncio.sleep(TERM_INTERVAL)
+
+    def stop_term(self, name: str):
+        """Stop an agent's terminal stream and drop its subscribers."""
+        term = self.terms.pop(name, None)
+        if term:
+            term["task"].cancel()
+
+    def set_watchers(self, count: int):
+        """Number of dashboard clients changed. A new one needs every current thumbnail, not just changes."""
+        if count > self.watchers:
+            self._thumbs_sent.clear()
+        self.watchers = count
+
+    async def stop_loop(self, info: dict, reason: str):
+        """
+        Stop the agent's work loop if it is running, and wait until it has unwound and no
+        container call of it is still running. `reason` is what the context says cut the commands short.
+        """
+        if info["working"]:
+            info["working"] = False
+            task = info.get("work_loop")
+            info["work_loop"] = None
+            if task and not task.done():
+                # running commands (preempted already or not): let the current one finish and skip
+                # the rest, so nothing is left half-done and the context says what didn't run. the
+                # loop then sees working is off. a model call has nothing half-done — cancelled right away
+                actions = info["agent"].actions
+                actions.preempt(reason)
+                if actions.running:
+                    await asyncio.wait([task], timeout=PREEMPT_GRACE)
+                if not task.done():
+                    task.cancel()
+                    await asyncio.wait([task])
+                # a blocking call the turn was in (typing, say) keeps running in its thread —
+                # freezing the container under it would leave the input half-done
+                await info["agent"].idle()
+
+    async def handle(self, msg: dict, client: int | None):
+        """Run one websocket command for an agent of this host. Replies go to `client`."""
+        cmd = msg.get("cmd")
+        name = msg.get("name")
+
+        if cmd == "create":
+            if not name:
+                await self.error(client, "name required")
+                return
+            if name in self.agents:
+                await self.error(client, f"agent {name} already exists")
+                return
+
+            # port picked by server.py — it sees every host's agents
+            novnc_port = msg["novnc_port"]
+            model = Claude()
+            agent = Agent(name, model, use_container=True, novnc_port=novnc_port)
+            self.agents[name] = {
+                "agent": agent,
+                "novnc_port": novnc_port,
+                "container_on": False,
+                "working": False,
+                # serializes start/pause/chat_mode/delete of this agent
+                "lock": asyncio.Lock(),
+            }
+            await self.notify()
+            return
+
+        if cmd == "dashboard":
+            # from server.py, not a client: how many clients want thumbnails
+            self.set_watchers(msg["watchers"])
+            return
+
+        if cmd == "start_all":
+            # names already checked and split per host by server.py
+            await self.start_agents(msg.get("names") or list(self.agents))
+            return
+
+        if name not in self.agents:
+            await self.error(client, f"agent {name} not found")
+            return
+        info = self.agents[name]
+
+        if cmd == "start":
+            await self.start_agent(name)
+
+        elif cmd == "pause":
+            async with info["lock"]:
+                if self.agents.get(name) is not info:
+                    # deleted while waiting for the lock
+                    return
+                await self.stop_loop(info, "paused")
+                await self.freeze(info)
+            await self.notify()
+
+        elif cmd == "delete":
+            async with info["lock"]:
+                if self.agents.get(name) is not info:
+                    return
+                await self.stop_loop(info, "deleted")
+                if info.get("pusher"):
+                    info["pusher"].cancel()
+                if info["agent"].container:
+                    await asyncio.to_thread(info["agent"].container.destroy)
+                await asyncio.to_thread(info["agent"].close)
+
+                del self.agents[name]
+                self._thumbs_sent.pop(name, None)
+                self._screens_thumbed.pop(name, None)
+                self.stop_term(name)
+                metrics.remove(agent=name)
+            await self.notify()
+
+        elif cmd == "chat_mode":
+            enabled = msg["enabled"]
+            async with info["lock"]:
+                if self.agents.get(name) is not info:
+                    return
+                info["agent"].chat_mode = enabled
+                if enabled:
+                    # entering chat mode: cancel work loop immediately
+                    await self.stop_loop(info, "chat mode")
+                    # chat turns never touch the container
+                    await self.freeze(info)
+                else:
+                    # leaving chat mode: cancel pending chat turn, restart work loop
+                    if info.get("chat_task") and not info["chat_task"].done():
+                        info["chat_task"].cancel()
+                        info["chat_task"] = None
+                    if info["container_on"] and not info["working"]:
+                        await self.thaw(info)
+                        info["working"] = True
+                        info["work_loop"] = asyncio.create_task(self.work_loop(name, info))
+            await self.notify()
+
+        elif cmd == "gui_feedback":
+            mode = msg.get("mode")
+            if mode not in ("look", "tree"):
+                await self.error(client, f"unknown gui_feedback mode: {mode}")
+                return
+            info["agent"].gui_feedback = mode
+            await self.notify()
+
+        elif cmd == "trace":
+            tracer = info["agent"].tracer
+            tracer.enabled = bool(msg.get("enabled"))
+            # write out whatever was recorded before tracing went off
+            tracer.flush()
+
+        elif cmd == "chat":
+            if not info["container_on"]:
+                await self.error(client, f"agent {name} not running")
+                return
+
+            agent = info["agent"]
+            # agent sees it next turn — and mid-command-list it cuts the list short
+            agent.message(msg.get("text", ""))
+            self.push_context(name, info)
+            if agent.chat_mode:
+                async def do_chat_turn():
+                    try:
+                        print(f"[chat_mode] calling turn for {name}")
+                        await agent.turn()
+                        self.push_context(name, info)
+                    except Exception as e:
+                        print(f"[chat_mode] ERROR: {e}")
+                info["chat_task"] = asyncio.create_task(do_chat_turn())
+
+        elif cmd == "term":
+            await self.subscribe_term(name, client, bool(msg.get("enabled")))
+
+        elif cmd == "get_context":
+            await self.send({"type": "context", "name": name, "messages": info["agent"].context.messages}, client)
+
+        else:
+            await self.error(client, f"unknown command: {cmd}")
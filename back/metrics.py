@@ -0,0 +1,187 @@
+"""
+In-process latency/usage metrics, served in Prometheus text format by server.py at /metrics.
+
+Histograms for durations (seconds), counters for totals, gauges for current levels. Series are keyed by metric
+name + labels; every series carries the agent name, some add more (cmd for commands).
+
+Usage:
+    with metrics.timer("intvrface_model_call_seconds", agent="agent_1"):
+        ...
+    metrics.observe("intvrface_settle_seconds", 0.4, agent="agent_1")
+    metrics.inc("intvrface_tokens_in_total", 1200, agent="agent_1")
+    metrics.gauge("intvrface_action_queue_depth", 3, agent="agent_1")
+    metrics.render()  # text for the /metrics endpoint
+    metrics.snapshot("intvrface_command_seconds", agent="agent_1")  # {labels: Histogram} for in-process reports
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+# histogram bucket upper bounds, seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# every metric, with its type and help text
+METRICS = {
+    "intvrface_turn_seconds": ("histogram", "Whole Agent.turn duration"),
+    "intvrface_model_call_seconds": ("histogram", "Model.call duration"),
+    "intvrface_summarize_seconds": ("histogram", "Model.summarize duration"),
+    "intvrface_command_seconds": ("histogram", "Execution time per command (file commands per batch, cmd=FILE_BATCH)"),
+    "intvrface_settle_seconds": ("histogram", "Post-input settle wait"),
+    "intvrface_screenshot_capture_seconds": ("histogram", "Screenshot capture in the container"),
+    "intvrface_image_encode_seconds": ("histogram", "Base64 encoding of an image added to context"),
+    "intvrface_terminal_read_seconds": ("histogram", "Reading and rendering the terminal log"),
+    "intvrface_context_write_seconds": ("histogram", "Context persistence: jsonl appends, working rewrite, kv cache save"),
+    "intvrface_tokens_in_total": ("counter", "Model input tokens"),
+    "intvrface_tokens_out_total": ("counter", "Model output tokens"),
+    "intvrface_action_queue_depth": ("gauge", "Commands of the running turn not started yet"),
+    "intvrface_action_wait_seconds": ("histogram", "Time a command waited in the action queue before it ran"),
+    "intvrface_preempt_seconds": ("histogram", "Preemption (operator message, pause) until the agent stopped its commands"),
+    "intvrface_actions_dropped_total": ("counter", "Queued commands dropped by preemption"),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Bucket counts (non-cumulative, last is +Inf) plus sum and count."""
+
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(BUCKETS) and value > BUCKETS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0-1) by linear interpolation inside its bucket, like PromQL histogram_quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            if cumulative + n >= rank and n:
+                if i == len(BUCKETS):
+                    # +Inf bucket has no upper bound — report the largest finite one
+                    return BUCKETS[-1]
+                lower = BUCKETS[i - 1] if i else 0.0
+                return lower + (BUCKETS[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return BUCKETS[-1]
+
+    def copy(self) -> "Histogram":
+        hist = Histogram()
+        hist.buckets, hist.sum, hist.count = list(self.buckets), self.sum, self.count
+        return hist
+
+
+# (name, labels) -> Histogram | float
+_series: dict[tuple[str, Labels], Histogram | float] = {}
+# observations come from the event loop and from to_thread workers
+_lock = threading.Lock()
+
+
+def _key(name: str, labels: dict[str, str]) -> tuple[str, Labels]:
+    assert name in METRICS, f"undeclared metric {name}"
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name: str, value: float, **labels: str):
+    """Record one histogram observation."""
+    key = _key(name, labels)
+    with _lock:
+        hist = _series.get(key)
+        if hist is None:
+            hist = _series[key] = Histogram()
+        assert isinstance(hist, Histogram)
+        hist.observe(value)
+
+
+def inc(name: str, value: float = 1, **labels: str):
+    """Add to a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _series[key] = _series.get(key, 0.0) + value  # type: ignore[operator]
+
+
+def gauge(name: str, value: float, **labels: str):
+    """Set a gauge."""
+    key = _key(name, labels)
+    with _lock:
+        _series[key] = float(value)
+
+
+@contextmanager
+def timer(name: str, **labels: str):
+    """Observe the duration of the with-block."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def remove(**labels: str):
+    """Drop every series matching labels (e.g. a deleted agent)."""
+    match = set(labels.items())
+    with _lock:
+        for key in [k for k in _series if match <= set(k[1])]:
+            del _series[key]
+
+
+def snapshot(name: str, **labels: str) -> dict[Labels, "Histogram | float"]:
+    """Copies of every series of one metric whose labels include `labels`, keyed by full label set."""
+    match = set(labels.items())
+    with _lock:
+        return {key[1]: value.copy() if isinstance(value, Histogram) else value
+                for key, value in _series.items() if key[0] == name and match <= set(key[1])}
+
+
+def _fmt_labels(labels: Labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    # label values escape backslash, quote and newline
+    esc = lambda v: v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+def dump() -> list:
+    """Plain-data copy of every series — picklable, for rendering in another process (see server.py workers)."""
+    with _lock:
+        # copy histogram state so rendering doesn't race with observers
+        return [(key, (list(v.buckets), v.sum, v.count) if isinstance(v, Histogram) else v) for key, v in _series.items()]
+
+
+def render(dumped: list | None = None) -> str:
+    """All series in Prometheus text exposition format. `dumped`: dump() output of one or more processes, concatenated."""
+    # sorted so each metric's series are contiguous under one HELP/TYPE header
+    snapshot = sorted(dump() if dumped is None else dumped, key=lambda item: item[0])
+    lines = []
+    last_name = None
+    for (name, labels), value in snapshot:
+        kind, help_text = METRICS[name]
+        if name != last_name:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            last_name = name
+        if kind in ("counter", "gauge"):
+            lines.append(f"{name}{_fmt_labels(labels)} {value}")
+            continue
+        buckets, total, count = value  # type: ignore[misc]
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {total}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,14 @@
-import torch
+from typing import TYPE_CHECKING
+
+# torch is only needed by local-model backends — keep it out of API-only startup
+if TYPE_CHECKING:
+    import torch
 
 # outer tuple: one entry per layer (... means repeat N layers)
 # inner tuple: (key_tensor, value_tensor) for that layer
 # each tensor shape: (batch, heads, seq_len, head_dim)
 # None for API models that don't expose kv cache
-KVCache = tuple[tuple[torch.Tensor, torch.Tensor], ...] | None
+KVCache = tuple[tuple["torch.Tensor", "torch.Tensor"], ...] | None
 
 
 class Model:
@@ -12,6 +16,9 @@ class Model:
     Base model wrapper. Subclass for API/local/remote models.
     """
 
+    # (input_tokens, output_tokens) of the most recent call/summarize — subclasses set it if they know
+    last_usage: tuple[int, int] = (0, 0)
+
     async def call(self, messages: list[dict], kv_cache: KVCache) -> tuple[str, KVCache]:
         """
         Run inference.
@@ -27,6 +27,7 @@ class Claude(Model):
             timeout=API_TIMEOUT,
         )
 
+        self.last_usage = (response.usage.input_tokens, response.usage.output_tokens)
         text = "".join(block.text for block in response.content if block.type == "text")
         return text, None
 
@@ -42,5 +43,6 @@ class Claude(Model):
             timeout=API_TIMEOUT,
         )
 
+        self.last_usage = (response.usage.input_tokens, response.usage.output_tokens)
         text = "".join(block.text for block in response.content if block.type == "text")
         return text, None
@@ -33,9 +33,14 @@ keyboard commands:
 perception commands:
 <func>LOOK</func> (takes a screenshot)
 <func>TERM</func> (latest 5000 chars of terminal output)
+<func>TREE</func> (text outline of the focused window's UI elements — role, name, value, center x,y for MOVE. much cheaper than LOOK for GUI apps like chromium. use LOOK when layout or visuals matter)
 
 special commands:
 <func>WAIT</func><param>secs</param> (pauses thinking, wait for external events)
+<func>WAIT</func><param>secs</param><param>condition</param> (wait up to secs, return as soon as condition holds. conditions:
+    term:regex — new terminal output matches regex
+    screen — anything on screen changes
+    file:/home/agent/path — file appears)
 
 file commands (handled directly via file I/O, bypasses terminal):
 <func>READ</func><param>/home/agent/file.py</param> (view file with line numbers)
@@ -51,8 +56,9 @@ some usage examples:
 <func>KEY</func><param>ctrl</param><param>shift</param><param>c</param>
 <func>LOOK</func>
 <func>WAIT</func><param>30</param>
+<func>WAIT</func><param>300</param><param>term:Successfully installed</param>
 
-auto-feedback: after mouse/keyboard commands, you automatically get TERM if xterm is focused or LOOK (screenshot) otherwise. no need to explicitly request.
+auto-feedback: after mouse/keyboard commands, you automatically get TERM if xterm is focused or LOOK (screenshot) otherwise (TREE instead of LOOK if the operator enabled tree feedback). no need to explicitly request.
 
 screenshots: a red crosshair circle is drawn at the current mouse position so you can see where the cursor is.
 
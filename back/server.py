@@ -5,122 +5,272 @@ Commands (client -> server):
     {"cmd": "list"}
     {"cmd": "create", "name": "agent_1", "novnc_port": 6080}
     {"cmd": "start", "name": "agent_1"}
-{"cmd": "delete", "name": "agent_1"}
+    {"cmd": "start_all", "names": ["agent_1", "agent_2"]}   (names optional, defaults to all)
+    {"cmd": "delete", "name": "agent_1"}
     {"cmd": "chat", "name": "agent_1", "text": "do this task"}
+    {"cmd": "gui_feedback", "name": "agent_1", "mode": "tree"}   (auto-feedback for GUI windows: "look" or "tree")
+    {"cmd": "trace", "name": "agent_1", "enabled": true}   (turn timeline to context/{name}/traces/, see tracing.py)
     {"cmd": "get_context", "name": "agent_1"}
+    {"cmd": "dashboard", "enabled": true}   (receive thumbnails of every agent's screen)
+    {"cmd": "term", "name": "agent_1", "enabled": true}   (stream the agent's terminal as it is written)
 
 Responses (server -> client):
     {"type": "agents", "agents": [{"name": "agent_1", "running": true, "novnc_port": 6080}, ...]}
     {"type": "context", "name": "agent_1", "messages": [...]}
+    {"type": "thumb", "name": "agent_1", "data": "<base64 jpeg>"}   (dashboard clients only, when the screen changed)
+    {"type": "term_delta", "name": "agent_1", "keep": 120, "text": "..."}   (term subscribers: screen text is
+                                                                          previous[:keep] + text; keep 0 = whole view)
     {"type": "error", "msg": "..."}
 
+Agents live in AgentHosts (host.py). With INTVRFACE_WORKERS=N (default 0) they are spread
+over N worker processes (worker.py) by crc32(name) % N, each with its own event loop and
+core; this process only routes commands, relays their messages to clients, keeps
+agents.json and merges /metrics. With 0, one AgentHost runs in this process.
+
 Run: uvicorn server:app --reload --port 8000
+     INTVRFACE_WORKERS=4 uvicorn server:app --port 8000
 """
 
+import os
 import json
 import asyncio
+import itertools
+import threading
+import multiprocessing
 from pathlib import Path
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
-from agent import Agent
-from models.claude import Claude
-import subprocess
+import metrics
+import worker
+from host import AgentHost, shard_of, DASHBOARD
+from container import pool
 import uvicorn
 
 app = FastAPI()
 
-# persisted to ~/intvrface/agents.json — {"agent_name": {"novnc_port": int}, ...}
-# only saves config (novnc_port). runtime state (working, container_on, etc.) is reconstructed on startup
+# persisted to ~/intvrface/agents.json — {"agent_name": {"novnc_port": int, "gui_feedback": "look"|"tree"}, ...}
+# only saves config (novnc_port, gui_feedback). runtime state (working, container_on, etc.) is reconstructed on startup
 AGENTS_FILE = Path.home() / "intvrface" / "agents.json"
 
-# active agents: name -> {"agent": Agent, "novnc_port": int, "container_on": bool, "working": bool}
-agents: dict[str, dict] = {}
+# worker processes for agents. 0: agents run on this process's event loop
+WORKERS = int(os.environ.get("INTVRFACE_WORKERS", "0"))
+
+# commands routed to the host owning msg["name"]. list and start_all are handled here
+AGENT_COMMANDS = {"create", "start", "pause", "delete", "chat_mode", "gui_feedback", "trace", "chat", "get_context", "term"}
 
 BASE_PORT = 6080
 
-def next_port() -> int:
+# connected websocket clients by id — hosts address replies to an id, they can't hold the socket
+clients: dict[int, WebSocket] = {}
+_client_ids = itertools.count()
+# ids of clients in dashboard mode (thumbnail grid)
+dashboard: set[int] = set()
+# client id -> agents whose terminal it streams, to unsubscribe on disconnect
+term_streams: dict[int, set[str]] = {}
+
+# LocalShard or ProcessShards, index = shard_of(name)
+shards: list = []
+# latest agent status / config each shard reported. config None until the shard has loaded
+shard_info: list[dict] = []
+shard_configs: list[dict | None] = []
+# agent name -> port handed to its create, until its shard reports the agent
+_reserved_ports: dict[str, int] = {}
+_saved_configs: dict | None = None
+
+
+def all_agents_info() -> dict:
+    return {name: info for part in shard_info for name, info in part.items()}
+
+
+def next_port(name: str) -> int:
     # find first unused port starting from BASE_PORT
-    used = {info["novnc_port"] for info in agents.values()}
+    used = {info["novnc_port"] for info in all_agents_info().values()} | set(_reserved_ports.values())
     port = BASE_PORT
     while port in used:
         port += 1
+    _reserved_ports[name] = port
     return port
 
-# connected websocket clients
-clients: list[WebSocket] = []
-
 
-def save_agents():
+def save_agents(configs: dict):
     """Save agent configs to disk."""
     AGENTS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    configs = {name: {"novnc_port": info["novnc_port"]} for name, info in agents.items()}
     AGENTS_FILE.write_text(json.dumps(configs))
 
 
-def is_container_running(name: str) -> bool:
-    """Check if a docker container is actually running."""
-    result = subprocess.run(
-        # ps: list processes, -q: only print container ids not the full table, -f: filter, ^{}$: regex full match
-        ["docker", "ps", "-q", "-f", f"name=^{name}$"],
-        capture_output=True, text=True
-    )
-    return bool(result.stdout.strip())
-
-
-def load_agents():
-    """Load agent configs from disk on startup."""
-    if not AGENTS_FILE.exists():
-        return
-    configs = json.loads(AGENTS_FILE.read_text())
-    for name, cfg in configs.items():
-        novnc_port = cfg["novnc_port"]
-        model = Claude()
-        agent = Agent(name, model, use_container=True, novnc_port=novnc_port)
-        # check actual docker state — container may still be running from last session
-        container_on = is_container_running(name)
-        if container_on:
-            agent.container._running = True
-        agents[name] = {"agent": agent, "novnc_port": novnc_port, "container_on": container_on, "working": False}
-
-
-# load saved agents on startup
-load_agents()
+async def broadcast_text(text: str):
+    """Send already-serialized message to all connected clients."""
+    for client in list(clients.values()):
+        try:
+            await client.send_text(text)
+        except:
+            pass
 
 
 async def broadcast(msg: dict):
     """Send message to all connected clients."""
-    text = json.dumps(msg)
-    for client in clients:
+    await broadcast_text(json.dumps(msg))
+
+
+async def deliver(text: str, client: int | None):
+    """Message from a host: to one client, or to all if client is None."""
+    if client is None:
+        await broadcast_text(text)
+    elif client == DASHBOARD:
+        for watcher in list(dashboard):
+            if watcher in clients:
+                try:
+                    await clients[watcher].send_text(text)
+                except:
+                    pass
+    elif client in clients:
         try:
-            await client.send_text(text)
+            await clients[client].send_text(text)
         except:
             pass
 
 
-# returns everything in agents except the agent objects for the frontend
-def get_agents_info() -> dict:
-    return {name: {"container_on": info["container_on"], "working": info["working"], "novnc_port": info["novnc_port"]} for name, info in agents.items()}
-
-
-async def work_loop(name: str, info: dict):
-    # loops agent.turn() until info["working"] is set to False
-    agent = info["agent"]
-    if not agent.context.messages:
-        agent.context.add("user", content="start working")
-    while info["working"]:
+async def set_dashboard(client: int, enabled: bool):
+    """Add/remove a dashboard client and tell every host how many there are."""
+    count = len(dashboard)
+    if enabled:
+        dashboard.add(client)
+    else:
+        dashboard.discard(client)
+    if len(dashboard) != count:
+        await asyncio.gather(*(shard.handle({"cmd": "dashboard", "watchers": len(dashboard)}, None) for shard in shards))
+
+
+async def on_changed(index: int, info: dict, configs: dict):
+    """A shard's agents changed: persist config once every shard has loaded, push the merged agent list."""
+    global _saved_configs
+    shard_info[index] = info
+    shard_configs[index] = configs
+    for name in info:
+        _reserved_ports.pop(name, None)
+    if all(part is not None for part in shard_configs):
+        merged = {name: cfg for part in shard_configs if part for name, cfg in part.items()}
+        if merged != _saved_configs:
+            save_agents(merged)
+            _saved_configs = merged
+    await broadcast({"type": "agents", "agents": all_agents_info()})
+
+
+class LocalShard:
+    """AgentHost on this process's event loop (WORKERS = 0)."""
+
+    def __init__(self):
+        self.host = AgentHost(self._send, self._changed)
+
+    async def _send(self, msg: dict, client: int | None):
+        await deliver(json.dumps(msg), client)
+
+    async def _changed(self, info: dict, configs: dict):
+        await on_changed(0, info, configs)
+
+    async def load(self, configs: dict):
+        await asyncio.to_thread(self.host.load, configs)
+        await self.host.notify()
+        self.thumbs = asyncio.create_task(self.host.thumb_loop())
+
+    async def handle(self, msg: dict, client: int | None):
+        await self.host.handle(msg, client)
+
+    async def metrics(self) -> list:
+        return metrics.dump()
+
+    def close(self):
+        pass
+
+
+class ProcessShard:
+    """AgentHost in a worker process, driven over a Pipe (protocol in worker.py)."""
+
+    def __init__(self, index: int, workers: int):
+        self.index = index
+        # spawn: a fresh interpreter — forking a process with an event loop and threads isn't safe
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=worker.main, args=(index, workers, child),
+                                   name=f"intvrface-worker-{index}", daemon=True)
+        self.process.start()
+        child.close()
+        self._requests = itertools.count()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._reader = asyncio.create_task(self._read())
+
+    async def load(self, configs: dict):
+        self.conn.send(("load", configs))
+
+    async def handle(self, msg: dict, client: int | None):
+        # fire and forget — replies and broadcasts come back through _read
+        self.conn.send(("cmd", msg, client))
+
+    async def metrics(self) -> list:
+        req = next(self._requests)
+        future = self._pending[req] = asyncio.get_running_loop().create_future()
+        self.conn.send(("metrics", req))
         try:
-            await agent.turn()
-            await broadcast({"type": "context", "name": name, "messages": agent.context.messages})
-        except asyncio.CancelledError:
-            break
+            return await asyncio.wait_for(future, 5)
         except asyncio.TimeoutError:
-            print(f"[work_loop] {name} API TIMEOUT — retrying in 5s")
-            await asyncio.sleep(5)
-        except Exception as e:
-            print(f"[work_loop] {name} error: {e}")
-            await asyncio.sleep(5)
+            print(f"[worker {self.index}] metrics timed out")
+            return []
+        finally:
+            self._pending.pop(req, None)
+
+    async def _read(self):
+        # one message at a time, so each client sees a worker's messages in order
+        while True:
+            try:
+                item = await asyncio.to_thread(self.conn.recv)
+            except (EOFError, OSError):
+                print(f"[worker {self.index}] exited")
+                break
+            kind = item[0]
+            if kind == "send":
+                await deliver(item[2], item[1])
+            elif kind == "changed":
+                await on_changed(self.index, item[1], item[2])
+            elif kind == "metrics":
+                future = self._pending.get(item[1])
+                if future and not future.done():
+                    future.set_result(item[2])
+
+    def close(self):
+        self._reader.cancel()
+        self.process.terminate()
+        self.process.join(5)
+        self.conn.close()
+
+
+@app.on_event("startup")
+async def startup():
+    """Start the agent hosts and hand each its saved agents."""
+    global _saved_configs
+    configs = json.loads(AGENTS_FILE.read_text()) if AGENTS_FILE.exists() else {}
+    _saved_configs = configs
+    if WORKERS:
+        # every worker refills its own share of the pool — clear leftovers once, before any of them start
+        if pool.size:
+            await asyncio.to_thread(pool.clean)
+        shards.extend(ProcessShard(i, WORKERS) for i in range(WORKERS))
+    else:
+        shards.append(LocalShard())
+        # boot warm sandbox containers in the background so the first start doesn't wait on docker run
+        if pool.size:
+            threading.Thread(target=pool.warm, daemon=True).start()
+    shard_info[:] = [{} for _ in shards]
+    shard_configs[:] = [None for _ in shards]
+    for i, shard in enumerate(shards):
+        await shard.load({name: cfg for name, cfg in configs.items() if shard_of(name, len(shards)) == i})
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for shard in shards:
+        shard.close()
 
 
 @app.websocket("/ws")
@@ -134,10 +284,11 @@ async def work_loop(name: str, info: dict):
 # FastAPI wraps it in a WebSocket python object → calls this function → ws.accept() completes the handshake
 async def websocket_endpoint(ws: WebSocket):
     await ws.accept()
-    clients.append(ws)
+    client = next(_client_ids)
+    clients[client] = ws
 
     # send current agents list on connect
-    await ws.send_text(json.dumps({"type": "agents", "agents": get_agents_info()}))
+    await ws.send_text(json.dumps({"type": "agents", "agents": all_agents_info()}))
 
     try:
         while True:
@@ -146,169 +297,60 @@ async def websocket_endpoint(ws: WebSocket):
             cmd = msg.get("cmd")
 
             if cmd == "list":
-                await ws.send_text(json.dumps({"type": "agents", "agents": get_agents_info()}))
-
-            elif cmd == "create":
-                name = msg.get("name")
-                novnc_port = next_port()
-
-                if not name:
-                    await ws.send_text(json.dumps({"type": "error", "msg": "name required"}))
-                    continue
-
-                if name in agents:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} already exists"}))
-                    continue
-
-                model = Claude()
-                agent = Agent(name, model, use_container=True, novnc_port=novnc_port)
-
-                agents[name] = {
-                    "agent": agent,
-                    "novnc_port": novnc_port,
-                    "container_on": False,
-                    "working": False,
-                }
-
-                save_agents()
-                await broadcast({"type": "agents", "agents": get_agents_info()})
-
-            elif cmd == "start":
-                name = msg.get("name")
-                if name not in agents:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} not found"}))
-                    continue
-
-                info = agents[name]
-                # container.start() has blocking subprocess.run() calls — can't run on main thread or event loop freezes
-                # to_thread spawns a separate OS thread so the main thread keeps processing websockets/tasks
-                #
-                # kernel
-                # ├── python process
-                # │   ├── OS thread 1 (main) ← event loop, websockets, asyncio tasks (switch at await)
-                # │   └── OS thread 2 (to_thread) ← blocked waiting on subprocess.run
-                # ├── docker process (spawned by subprocess.run, not under any thread)
-                # └── ...
-                #
-                # await (asyncio tasks): non-blocking for external I/O (network, API calls). shares one thread, switches at await
-                # threading (to_thread): non-blocking for non-python blocking code (subprocess, C calls, GPU). GIL blocks python-on-python
-                # multiprocessing: truly parallel python. separate processes, separate GILs, but no shared memory
-                if not info["container_on"]:
-                    agent = info["agent"]
-                    if agent.container and not agent.container._running:
-                        # GIL in python means only one thread within a process can execute python code at one time, however container.start calls OS to spawn subprocess blocking code which is a different thread
-                        await asyncio.to_thread(agent.container.start)
-                    info["container_on"] = True
-
-                # start work loop if not working
-                if not info["working"]:
-                    info["working"] = True
-                    info["work_loop"] = asyncio.create_task(work_loop(name, info))
-
-                await broadcast({"type": "agents", "agents": get_agents_info()})
-
-            elif cmd == "pause":
-                name = msg.get("name")
-                if name not in agents:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} not found"}))
-                    continue
-
-                info = agents[name]
-                if info["working"]:
-                    info["working"] = False
-                    if info.get("work_loop") and not info["work_loop"].done():
-                        info["work_loop"].cancel()
-                        info["work_loop"] = None
-
-                await broadcast({"type": "agents", "agents": get_agents_info()})
-
-            elif cmd == "delete":
-                name = msg.get("name")
-                if name not in agents:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} not found"}))
+                await ws.send_text(json.dumps({"type": "agents", "agents": all_agents_info()}))
+
+            elif cmd == "start_all":
+                # names optional — defaults to every agent
+                names = msg.get("names") or list(all_agents_info())
+                missing = [n for n in names if n not in all_agents_info()]
+                if missing:
+                    await ws.send_text(json.dumps({"type": "error", "msg": f"agents not found: {', '.join(missing)}"}))
                     continue
-
-                info = agents[name]
-                info["working"] = False
-                if info["agent"].container:
-                    await asyncio.to_thread(info["agent"].container.destroy)
-
-                del agents[name]
-                save_agents()
-                await broadcast({"type": "agents", "agents": get_agents_info()})
-
-            elif cmd == "chat_mode":
-                name = msg.get("name")
-                enabled = msg["enabled"]
-
-                if name not in agents:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} not found"}))
-                    continue
-
-                info = agents[name]
-                info["agent"].chat_mode = enabled
-                if enabled:
-                    # entering chat mode: cancel work loop immediately
-                    if info["working"]:
-                        info["working"] = False
-                        if info.get("work_loop") and not info["work_loop"].done():
-                            info["work_loop"].cancel()
-                            info["work_loop"] = None
-                else:
-                    # leaving chat mode: cancel pending chat turn, restart work loop
-                    if info.get("chat_task") and not info["chat_task"].done():
-                        info["chat_task"].cancel()
-                        info["chat_task"] = None
-                    if info["container_on"] and not info["working"]:
-                        info["working"] = True
-                        info["work_loop"] = asyncio.create_task(work_loop(name, info))
-
-                await broadcast({"type": "agents", "agents": get_agents_info()})
-
-            elif cmd == "chat":
-                name = msg.get("name")
-                text = msg.get("text", "")
-
-                if name not in agents:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} not found"}))
-                    continue
-
-                info = agents[name]
-                if not info["container_on"]:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} not running"}))
-                    continue
-
-                # add user message to context — agent sees it next turn
-                info["agent"].context.add("user", content=text)
-                await broadcast({"type": "context", "name": name, "messages": info["agent"].context.messages})
-                if info["agent"].chat_mode:
-                    agent = info["agent"]
-                    async def do_chat_turn(_name=name, _agent=agent):
-                        try:
-                            print(f"[chat_mode] calling turn for {_name}")
-                            await _agent.turn()
-                            await broadcast({"type": "context", "name": _name, "messages": _agent.context.messages})
-                        except Exception as e:
-                            print(f"[chat_mode] ERROR: {e}")
-                    info["chat_task"] = asyncio.create_task(do_chat_turn())
-
-            elif cmd == "get_context":
-                name = msg.get("name")
-                if name not in agents:
-                    await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} not found"}))
-                    continue
-
-                messages = agents[name]["agent"].context.messages
-                await ws.send_text(json.dumps({"type": "context", "name": name, "messages": messages}))
+                # each host starts its own share, concurrently with the others
+                parts = [[n for n in names if shard_of(n, len(shards)) == i] for i in range(len(shards))]
+                await asyncio.gather(*(shard.handle({"cmd": "start_all", "names": part}, client)
+                                       for shard, part in zip(shards, parts) if part))
+
+            elif cmd == "dashboard":
+                await set_dashboard(client, bool(msg.get("enabled")))
+
+            elif cmd in AGENT_COMMANDS:
+                name = str(msg.get("name") or "")
+                if cmd == "create" and name:
+                    # rejected here, not by the host: a create the host refused would keep its port reserved
+                    if name in _reserved_ports or name in all_agents_info():
+                        await ws.send_text(json.dumps({"type": "error", "msg": f"agent {name} already exists"}))
+                        continue
+                    # ports are global — picked here, where every shard's agents are visible
+                    msg["novnc_port"] = next_port(name)
+                elif cmd == "term":
+                    streams = term_streams.setdefault(client, set())
+                    if msg.get("enabled"):
+                        streams.add(name)
+                    else:
+                        streams.discard(name)
+                await shards[shard_of(name, len(shards))].handle(msg, client)
 
             else:
                 await ws.send_text(json.dumps({"type": "error", "msg": f"unknown command: {cmd}"}))
 
     except WebSocketDisconnect:
-        clients.remove(ws)
+        clients.pop(client, None)
     except Exception as e:
-        clients.remove(ws)
+        clients.pop(client, None)
         print(f"WebSocket error: {e}")
+    await set_dashboard(client, False)
+    for name in term_streams.pop(client, ()):
+        await shards[shard_of(name, len(shards))].handle({"cmd": "term", "name": name, "enabled": False}, client)
+
+
+# prometheus scrape target: per-agent turn latency breakdown, token counts
+# declared before the /{filename} catch-all so it isn't served as a static file
+# with workers, each process's series are fetched and rendered together
+@app.get("/metrics")
+async def metrics_endpoint():
+    dumped = [series for part in await asyncio.gather(*(shard.metrics() for shard in shards)) for series in part]
+    return PlainTextResponse(metrics.render(dumped), media_type="text/plain; version=0.0.4")
 
 
 # serve frontend static files
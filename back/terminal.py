@@ -0,0 +1,291 @@
+"""
+Reader for the terminal log at workspace/{name}/term.log.
+
+`script -f` records the raw pty stream: prompts, colors, cursor movement, line redraws,
+full-screen apps. render() replays that stream through a minimal terminal model and
+returns the text that ended up on screen, so TERM feedback doesn't spend tokens on
+escape sequences.
+
+term.log is never read whole:
+    tail()      seeks to the last TAIL_BYTES and renders those
+    read_new()  renders only bytes appended since the previous call (stream offset, kept across rotations)
+
+LiveTerm keeps the rendered end of the log up to date for streaming to the UI: each
+update() reads only the appended bytes and returns the change as (keep, text).
+
+Usage:
+    log = TerminalLog(workspace / "term.log")
+    log.tail()        # last ~5000 chars of clean screen text
+    log.mark()        # remember current end
+    log.read_new()    # output since mark()
+"""
+
+import os
+import re
+from pathlib import Path
+
+# chars of rendered output given to the model per TERM
+TAIL_CHARS = 5000
+# raw bytes read from the end for a tail. escape sequences make the raw stream longer than what it renders to
+TAIL_BYTES = TAIL_CHARS * 4
+# term.log is rotated to term.log.1 past this size
+ROTATE_BYTES = 8 * 1024 * 1024
+# rows of the visible screen, for absolute cursor positioning (xterm default 80x24)
+SCREEN_ROWS = 24
+# raw bytes a live view renders. trimmed back to this at a line start once it has doubled
+LIVE_BYTES = TAIL_BYTES
+
+# one token per escape sequence or control char. text between matches is printable
+TOKEN_RE = re.compile(
+    # CSI: ESC [ params intermediates final — cursor movement, erase, colors
+    r'\x1b\[([0-?]*)[ -/]*([@-~])'
+    # OSC: ESC ] ... BEL or ESC \ — window title etc.
+    r'|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)?'
+    # charset designation: ESC ( B etc.
+    r'|\x1b[()*+].'
+    # any other two-char escape
+    r'|\x1b.?'
+    # single control char (\n \r \b \t handled, the rest dropped)
+    r'|([\x00-\x1f\x7f])',
+    re.DOTALL,
+)
+
+
+def render(raw: str) -> str:
+    """Replay a raw terminal stream and return the resulting screen text."""
+    lines: list[list[str]] = [[]]
+    row = col = 0
+    # alternate screen (vim, less, top) — saved main screen restored on exit
+    saved: tuple[list[list[str]], int, int] | None = None
+
+    def put(text: str):
+        nonlocal col
+        line = lines[row]
+        if col > len(line):
+            line.extend(' ' * (col - len(line)))
+        line[col:col + len(text)] = text
+        col += len(text)
+
+    pos = 0
+    for m in TOKEN_RE.finditer(raw):
+        if m.start() > pos:
+            put(raw[pos:m.start()])
+        pos = m.end()
+        ctrl = m.group(3)
+        if ctrl == '\n':
+            row += 1
+            col = 0
+            if row == len(lines):
+                lines.append([])
+        elif ctrl == '\r':
+            col = 0
+        elif ctrl == '\b':
+            col = max(col - 1, 0)
+        elif ctrl == '\t':
+            put(' ' * (8 - col % 8))
+        elif m.group(2):
+            params, final = m.group(1), m.group(2)
+            nums = [int(p) if p.isdigit() else 0 for p in params.lstrip('?').split(';')]
+            n = max(nums[0], 1)
+            if final == 'K':
+                # erase in line: 0 cursor to end, 1 start to cursor, 2 whole line
+                if nums[0] == 0:
+                    del lines[row][col:]
+                elif nums[0] == 1:
+                    lines[row][:col] = ' ' * min(col, len(lines[row]))
+                else:
+                    lines[row] = []
+            elif final == 'J':
+                # erase in display: 0 cursor to end, 2/3 whole screen (`clear` — earlier output is gone)
+                if nums[0] == 0:
+                    del lines[row][col:]
+                    del lines[row + 1:]
+                elif nums[0] >= 2:
+                    lines, row, col = [[]], 0, 0
+            elif final == 'C':
+                col += n
+            elif final == 'D':
+                col = max(col - n, 0)
+            elif final == 'G':
+                col = n - 1
+            elif final in 'AB':
+                row = max(row - n, 0) if final == 'A' else row + n
+                while row >= len(lines):
+                    lines.append([])
+            elif final in 'Hf':
+                # absolute position is relative to the visible screen: the last SCREEN_ROWS lines
+                top = max(len(lines) - SCREEN_ROWS, 0)
+                row = top + n - 1
+                col = max(nums[1], 1) - 1 if len(nums) > 1 else 0
+                while row >= len(lines):
+                    lines.append([])
+            elif params.startswith('?') and nums[0] in (47, 1047, 1049) and final in 'hl':
+                if final == 'h' and saved is None:
+                    saved = (lines, row, col)
+                    lines, row, col = [[]], 0, 0
+                elif final == 'l' and saved is not None:
+                    lines, row, col = saved
+                    saved = None
+    if pos < len(raw):
+        put(raw[pos:])
+
+    text = '\n'.join(''.join(line).rstrip() for line in lines)
+    return text.strip('\n')
+
+
+def log_span(path: Path) -> tuple[int, int]:
+    """
+    (bytes Container.rotate_term_log has cut from the front of the log, its current size).
+    Offsets into the whole stream stay valid across rotations: file position = offset - cut.
+    """
+    cut_path = path.with_name(path.name + ".cut")
+    while True:
+        cut = _read_cut(cut_path)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        # the cut is recorded right after the bytes are removed — a rotation in between is retried
+        if _read_cut(cut_path) == cut:
+            return cut, size
+
+
+def _read_cut(cut_path: Path) -> int:
+    try:
+        return int(cut_path.read_text() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def log_start(offset: int, cut: int, size: int) -> tuple[int, bool]:
+    """File position to read from for stream offset, and whether output before it was skipped unread."""
+    start = offset - cut
+    if start > size:
+        # shrunk with no recorded cut (the log was replaced) — the new file starts from zero
+        return 0, False
+    # a rotation took bytes that were never read — they are in term.log.1
+    return max(start, 0), start < 0
+
+
+class TerminalLog:
+    """Tail-seeking, offset-tracking reader for a `script -f` log."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        # previous chunk, written by Container.rotate_term_log
+        self.rotated_path = path.with_name(path.name + ".1")
+        # stream offset (counts rotated bytes, see log_span) up to which read_new() has reported
+        self.offset = 0
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def tail(self, chars: int = TAIL_CHARS) -> str | None:
+        """Last `chars` of rendered output, or None if nothing was ever logged."""
+        if not self.path.exists():
+            return None
+        raw, cut = self._read_from_end(self.path, TAIL_BYTES)
+        # just rotated — the rest of the tail is in term.log.1
+        if len(raw) < TAIL_BYTES and self.rotated_path.exists():
+            older, cut = self._read_from_end(self.rotated_path, TAIL_BYTES - len(raw))
+            raw = older + raw
+        return render(self._decode(raw, partial=cut))[-chars:]
+
+    def mark(self):
+        """Treat everything logged so far as reported."""
+        cut, size = log_span(self.path)
+        self.offset = cut + size
+
+    def read_new(self, limit: int = TAIL_BYTES) -> str:
+        """Rendered output appended since the last read_new()/mark(). Only the last `limit` bytes if more."""
+        cut, size = log_span(self.path)
+        # rotated since the last read: resumes where it left off, not at the start of the file
+        resume, skipped = log_start(self.offset, cut, size)
+        start = max(resume, size - limit)
+        self.offset = cut + size
+        if start >= size:
+            return ""
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            raw = f.read(size - start)
+        # skipped ahead of the last reported offset — may have landed mid-line
+        partial = skipped or start > resume
+        return render(self._decode(raw, partial=partial))
+
+    def _read_from_end(self, path: Path, n: int) -> tuple[bytes, bool]:
+        """Last n bytes of path, and whether that cut off the start of the file."""
+        with open(path, "rb") as f:
+            # 2: seek relative to end of file
+            f.seek(0, 2)
+            start = max(f.tell() - n, 0)
+            f.seek(start)
+            return f.read(), start > 0
+
+    def _decode(self, raw: bytes, partial: bool) -> str:
+        text = raw.decode("utf-8", errors="replace")
+        if partial:
+            # started mid-stream: the first line may begin inside an escape sequence or utf-8 char
+            newline = text.find('\n')
+            text = text[newline + 1:] if newline != -1 else text
+        return text
+
+
+class LiveTerm:
+    """
+    Rendered screen text of the end of term.log, updated from appended bytes only.
+
+    A client holding the previous text applies an update (keep, text) as
+    previous[:keep] + text — usually keep is the whole previous text and text is
+    the new output, but redraws (\\r, backspace, clears) rewrite the end.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        # stream offset (counts rotated bytes, see log_span) read up to
+        self.offset = 0
+        # raw stream being rendered, and whether it starts mid-line
+        self.raw = b""
+        self.partial = False
+        # what clients have
+        self.text = ""
+
+    def update(self) -> tuple[int, str] | None:
+        """Read appended bytes. Returns (keep, text) if the rendered text changed, else None. Blocking."""
+        cut, size = log_span(self.path)
+        # rotated: what we already read is in term.log.1, the rest of term.log continues it
+        resume, skipped = log_start(self.offset, cut, size)
+        if resume == size:
+            return None
+        start = max(resume, size - LIVE_BYTES)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            chunk = f.read(size - start)
+        if skipped or start > resume:
+            # more appended than we render — start over from the end
+            self.raw, self.partial = chunk, True
+        else:
+            self.raw += chunk
+        self.offset = cut + start + len(chunk)
+        if len(self.raw) > 2 * LIVE_BYTES:
+            # drop old output at a line start, so the view only resets once per LIVE_BYTES
+            newline = self.raw.find(b"\n", len(self.raw) - LIVE_BYTES)
+            if newline == -1:
+                self.raw, self.partial = self.raw[-LIVE_BYTES:], True
+            else:
+                self.raw, self.partial = self.raw[newline + 1:], False
+
+        text = self.raw.decode("utf-8", errors="replace")
+        if self.partial:
+            # may begin inside an escape sequence or utf-8 char
+            newline = text.find('\n')
+            text = text[newline + 1:] if newline != -1 else text
+        text = render(text)
+        if text == self.text:
+            return None
+        # common case: output appended, nothing before it redrawn
+        keep = len(self.text) if text.startswith(self.text) else len(os.path.commonprefix([self.text, text]))
+        self.text = text
+        return keep, text[keep:]
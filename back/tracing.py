@@ -0,0 +1,111 @@
+"""
+Opt-in per-turn timeline tracing in Chrome trace-event format.
+
+Each agent has a Tracer that appends complete ("ph": "X") events to
+context/{name}/traces/{session start}.json. The file is the JSON array form without the
+closing bracket, which trace viewers (chrome://tracing, ui.perfetto.dev) accept — so
+events are appended as turns finish, never rewritten.
+
+Spans come from:
+    Agent.turn phases        tracer.span(...) / tracer.record(...)
+    Container subprocesses   tracing.span(...) — attaches to the tracer of the running turn
+    Context writes           tracing.span(...)
+    websocket broadcasts     tracer.span("broadcast") in server.py
+
+The running turn's tracer is found through a contextvar, which asyncio.to_thread copies
+into worker threads. Disabled (the default) a span is one check returning a shared no-op
+context manager. Enable with INTVRFACE_TRACE=1 or per agent with the server's trace command.
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+CONTEXT_ROOT = Path.home() / "intvrface" / "context"
+# default for new tracers
+ENABLED = os.environ.get("INTVRFACE_TRACE") == "1"
+
+_NULL = nullcontext()
+# tracer of the agent whose turn is running in this task/thread
+_active: contextvars.ContextVar["Tracer | None"] = contextvars.ContextVar("tracer", default=None)
+
+
+class Tracer:
+    """Buffers span events for one agent and appends them to its trace file on flush()."""
+
+    def __init__(self, name: str, enabled: bool = ENABLED):
+        self.name = name
+        self.folder = CONTEXT_ROOT / name / "traces"
+        self.enabled = enabled
+        # created on first flush — one file per server session
+        self._path: Path | None = None
+        self._events: list[str] = []
+        # spans close on the event loop and in to_thread workers
+        self._lock = threading.Lock()
+
+    def span(self, name: str, cat: str = "agent", **args):
+        """Context manager recording the with-block as one event."""
+        if not self.enabled:
+            return _NULL
+        return self._span(name, cat, args)
+
+    @contextmanager
+    def _span(self, name: str, cat: str, args: dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, cat, start, **args)
+
+    def record(self, name: str, cat: str, start: float, **args):
+        """Record an event from perf_counter() start until now."""
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        event = {
+            "name": name, "cat": cat, "ph": "X",
+            # trace viewers expect microseconds
+            "ts": round(start * 1e6), "dur": round((end - start) * 1e6),
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "args": args,
+        }
+        line = json.dumps(event)
+        with self._lock:
+            self._events.append(line)
+
+    @contextmanager
+    def activate(self):
+        """Route module-level span() calls in this task (and threads it starts) to this tracer."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def flush(self):
+        """Append buffered events to the trace file."""
+        with self._lock:
+            if not self._events:
+                return
+            events, self._events = self._events, []
+            if self._path is None:
+                self.folder.mkdir(parents=True, exist_ok=True)
+                self._path = self.folder / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+                prefix = "[\n"
+            else:
+                # comma before each later batch, so the file never ends in a dangling comma
+                prefix = ",\n"
+            with open(self._path, "a") as f:
+                f.write(prefix + ",\n".join(events))
+
+
+def span(name: str, cat: str, **args):
+    """Span on the tracer of the running turn, no-op outside a turn or when tracing is off."""
+    tracer = _active.get()
+    if tracer is None or not tracer.enabled:
+        return _NULL
+    return tracer._span(name, cat, args)
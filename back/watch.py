@@ -0,0 +1,94 @@
+"""
+Change notification for directories in the bind-mounted workspace.
+
+Container processes write through the bind mount to the host filesystem, so host-side
+inotify sees their writes (term.log appends, new files) without any docker exec.
+inotify is called through libc with ctypes. Where it isn't available (non-Linux dev
+machines) wait() degrades to a short sleep — a spurious wake-up callers already handle.
+
+Usage:
+    with DirWatch(workspace) as w:
+        while not condition():        # check AFTER the watch exists so no change is missed
+            await w.wait(remaining)
+"""
+
+import os
+import asyncio
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+# fallback wake-up interval without inotify
+POLL_INTERVAL = 0.25
+
+_libc: ctypes.CDLL | None = None
+_libc_loaded = False
+
+
+def _inotify_libc() -> ctypes.CDLL | None:
+    """libc with inotify functions, or None if this platform has no inotify."""
+    global _libc, _libc_loaded
+    if not _libc_loaded:
+        _libc_loaded = True
+        name = ctypes.util.find_library("c")
+        if name:
+            libc = ctypes.CDLL(name, use_errno=True)
+            if hasattr(libc, "inotify_init1"):
+                _libc = libc
+    return _libc
+
+
+class DirWatch:
+    """inotify watch on one directory: wakes when a file in it is created, modified or moved in."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fd = -1
+
+    def __enter__(self) -> "DirWatch":
+        libc = _inotify_libc()
+        if libc is None:
+            return self
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return self
+        if libc.inotify_add_watch(fd, os.fsencode(self.path), IN_MODIFY | IN_CREATE | IN_MOVED_TO) < 0:
+            os.close(fd)
+            return self
+        self.fd = fd
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for the next change. False on timeout. Without inotify, sleeps POLL_INTERVAL and returns True."""
+        if self.fd < 0:
+            await asyncio.sleep(min(timeout, POLL_INTERVAL))
+            return True
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        # fd becomes readable when events are queued — the event loop wakes us, no polling
+        loop.add_reader(self.fd, ready.set)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(self.fd)
+        self._drain()
+        return True
+
+    def _drain(self):
+        """Discard queued events — callers re-check their own condition, event details don't matter."""
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
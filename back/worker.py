@@ -0,0 +1,85 @@
+"""
+Worker process: one AgentHost with its own event loop, for the agents server.py routes to it.
+
+server.py starts WORKERS of these (multiprocessing spawn) and talks to each over a Pipe.
+CPU-heavy per-agent work — base64 of screenshots in Context.add, json.dumps of whole
+contexts for broadcasts — then runs on one core per worker instead of all on the
+server's loop. Broadcasts are serialized here, so server.py forwards ready JSON text.
+
+Pipe protocol (tuples, pickled by multiprocessing):
+    server -> worker   ("load", configs)            agents of this shard, once at startup
+                       ("cmd", msg, client)         websocket command for one of our agents, or
+                                                    {"cmd": "dashboard", "watchers": n} from server.py
+                       ("metrics", req)             ask for this process's metrics
+    worker -> server   ("send", client, text)       JSON text for one client (None: everyone, DASHBOARD: dashboard clients)
+                       ("changed", info, configs)   our agents' status/config
+                       ("metrics", req, dumped)     metrics.dump() of this process
+"""
+
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+
+import metrics
+from host import AgentHost
+from container import pool
+
+
+def main(index: int, workers: int, conn: Connection):
+    """Process entry point."""
+    # each worker keeps its share of the warm pool. server.py removed leftovers before starting us
+    pool.size = -(-pool.size // workers)
+    pool.refill()
+    print(f"[worker {index}] started")
+    asyncio.run(serve(conn))
+
+
+async def serve(conn: Connection):
+    loop = asyncio.get_running_loop()
+    # one sender thread: messages leave in the order they were produced, and a big
+    # context never blocks the loop while the pipe drains
+    out = ThreadPoolExecutor(max_workers=1)
+
+    async def post(*item):
+        await loop.run_in_executor(out, conn.send, item)
+
+    async def send(msg: dict, client: int | None):
+        await post("send", client, json.dumps(msg))
+
+    async def changed(info: dict, configs: dict):
+        await post("changed", info, configs)
+
+    host = AgentHost(send, changed)
+    # commands run as tasks so a slow one (container boot) doesn't hold up the others
+    tasks: set[asyncio.Task] = set()
+    # ...but commands for one agent run one at a time, in arrival order, as they do in-process
+    # (a double-clicked start must not boot the container twice). asyncio.Lock wakes waiters FIFO
+    locks: dict[str, asyncio.Lock] = {}
+
+    async def run(msg: dict, client: int | None):
+        name = msg.get("name")
+        if not name:
+            # host-wide commands (start_all, dashboard)
+            await host.handle(msg, client)
+            return
+        async with locks.setdefault(str(name), asyncio.Lock()):
+            await host.handle(msg, client)
+
+    while True:
+        try:
+            item = await asyncio.to_thread(conn.recv)
+        except EOFError:
+            # server exited
+            break
+        kind = item[0]
+        if kind == "load":
+            await asyncio.to_thread(host.load, item[1])
+            await host.notify()
+            tasks.add(asyncio.create_task(host.thumb_loop()))
+        elif kind == "cmd":
+            task = asyncio.create_task(run(item[1], item[2]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        elif kind == "metrics":
+            await post("metrics", item[1], metrics.dump())
@@ -1,19 +1,34 @@
 // WebSocket connection
 let ws = null;
-// {name: {container_on, working, novnc_port}} — same format as backend
+// {name: {container_on, working, novnc_port, frozen, gui_feedback}} — same format as backend
 let agents = {};
 let selectedAgent = null;
 let chatMode = false;
+// dashboard: thumbnail grid of all agents, no VNC stream until one is selected
+let dashboardMode = false;
+// name -> {cell, img, label} of the thumbnail grid
+const thumbCells = new Map();
+// term: live terminal text of the selected agent instead of VNC
+let termMode = false;
+// agent whose terminal we're subscribed to, and its screen text so far
+let termAgent = null;
+let termText = '';
 
 // DOM elements
 const agentList = document.getElementById('agent-list');
 const newAgentName = document.getElementById('new-agent-name');
 const createBtn = document.getElementById('create-btn');
+const startAllBtn = document.getElementById('start-all-btn');
+const dashboardBtn = document.getElementById('dashboard-btn');
+const thumbGrid = document.getElementById('thumb-grid');
 const chatInput = document.getElementById('chat-input');
 const startBtn = document.getElementById('start-btn');
 const pauseBtn = document.getElementById('pause-btn');
 const deleteBtn = document.getElementById('delete-btn');
 const chatModeBtn = document.getElementById('chat-mode-btn');
+const treeBtn = document.getElementById('tree-btn');
+const termBtn = document.getElementById('term-btn');
+const termView = document.getElementById('term-view');
 const contextMessages = document.getElementById('context-messages');
 const vncPlaceholder = document.getElementById('vnc-placeholder');
 const vncFrame = document.getElementById('vnc-frame');
@@ -25,6 +40,10 @@ function connect() {
 
     ws.onopen = () => {
         console.log('Connected to server');
+        // subscriptions don't survive a reconnect
+        if (dashboardMode) send({ cmd: 'dashboard', enabled: true });
+        termAgent = null;
+        updateVnc();
     };
 
     // incoming messages
@@ -50,13 +69,22 @@ function handleMessage(msg) {
         case 'agents':
             agents = msg.agents;
             renderAgentList();
+            renderGrid();
             updateButtons();
             updateVnc();
             break;
 
+        case 'thumb':
+            updateThumb(msg.name, msg.data);
+            break;
+
+        case 'term_delta':
+            if (msg.name === termAgent) applyTermDelta(msg.keep, msg.text);
+            break;
+
         case 'context':
             if (msg.name === selectedAgent) {
-                renderContext(msg.messages);
+                renderContext(msg.name, msg.messages);
             }
             break;
 
@@ -78,7 +106,7 @@ function renderAgentList() {
     agentList.innerHTML = '';
     for (const [name, info] of Object.entries(agents)) {
         const li = document.createElement('li');
-        const status = info.working ? 'working' : info.container_on ? 'paused' : 'stopped';
+        const status = info.working ? 'working' : info.container_on ? (info.frozen ? 'frozen' : 'paused') : 'stopped';
         const statusClass = info.working ? 'working' : info.container_on ? 'paused' : '';
         li.innerHTML = `
             <div>${name}</div>
@@ -97,16 +125,27 @@ function renderAgentList() {
 // Select an agent
 function selectAgent(name) {
     selectedAgent = name;
+    resetContext(name);
     renderAgentList();
     updateButtons();
     updateVnc();
     send({ cmd: 'get_context', name: name });
+    renderGrid();
 }
 
 // Update VNC iframe based on selected agent's state
 function updateVnc() {
     const agent = selectedAgent ? agents[selectedAgent] : null;
-    if (agent && agent.container_on) {
+    const showTerm = termMode && !dashboardMode && !!agent;
+    thumbGrid.style.display = dashboardMode ? 'grid' : 'none';
+    termView.style.display = showTerm ? 'block' : 'none';
+    setTermAgent(showTerm ? selectedAgent : null);
+    if (dashboardMode || showTerm) {
+        // grid / terminal text replaces the live view — dropping the iframe closes its VNC stream
+        vncPlaceholder.style.display = 'none';
+        vncFrame.style.display = 'none';
+        vncFrame.src = '';
+    } else if (agent && agent.container_on) {
         // only reload iframe if src changed (avoid reconnecting on every update)
         const url = `http://localhost:${agent.novnc_port}/vnc.html?autoconnect=true`;
         if (vncFrame.src !== url) vncFrame.src = url;
@@ -120,6 +159,70 @@ function updateVnc() {
     }
 }
 
+// Thumbnail grid: one cell per agent, images filled in by 'thumb' messages
+function renderGrid() {
+    for (const [name, entry] of thumbCells) {
+        if (!(name in agents)) {
+            entry.cell.remove();
+            thumbCells.delete(name);
+        }
+    }
+    for (const [name, info] of Object.entries(agents)) {
+        let entry = thumbCells.get(name);
+        if (!entry) {
+            const cell = document.createElement('div');
+            cell.className = 'thumb-cell';
+            const img = document.createElement('img');
+            const label = document.createElement('div');
+            label.className = 'thumb-label';
+            cell.appendChild(img);
+            cell.appendChild(label);
+            // clicking a thumbnail opens that agent's full VNC
+            cell.onclick = () => {
+                setDashboard(false);
+                selectAgent(name);
+            };
+            thumbGrid.appendChild(cell);
+            entry = { cell, img, label };
+            thumbCells.set(name, entry);
+        }
+        const status = info.working ? 'working' : info.container_on ? (info.frozen ? 'frozen' : 'paused') : 'stopped';
+        entry.label.textContent = `${name} | ${status}`;
+        entry.cell.classList.toggle('selected', name === selectedAgent);
+    }
+}
+
+function updateThumb(name, data) {
+    const entry = thumbCells.get(name);
+    if (entry) entry.img.src = `data:image/jpeg;base64,${data}`;
+}
+
+// subscribe to one agent's terminal stream (null: none)
+function setTermAgent(name) {
+    if (termAgent === name) return;
+    if (termAgent) send({ cmd: 'term', name: termAgent, enabled: false });
+    termAgent = name;
+    termText = '';
+    termView.textContent = '';
+    if (name) send({ cmd: 'term', name: name, enabled: true });
+}
+
+// screen text is previous[:keep] + text — keep 0 replaces everything
+function applyTermDelta(keep, text) {
+    const following = termView.scrollTop + termView.clientHeight >= termView.scrollHeight - STICK_THRESHOLD;
+    termText = termText.slice(0, keep) + text;
+    termView.textContent = termText;
+    if (following) termView.scrollTop = termView.scrollHeight;
+}
+
+function setDashboard(enabled) {
+    if (dashboardMode === enabled) return;
+    dashboardMode = enabled;
+    dashboardBtn.classList.toggle('active', enabled);
+    send({ cmd: 'dashboard', enabled: enabled });
+    updateVnc();
+}
+
 // Update button states
 function updateButtons() {
     const agent = selectedAgent ? agents[selectedAgent] : null;
@@ -130,79 +233,254 @@ function updateButtons() {
     startBtn.disabled = !hasSelection || isWorking;
     pauseBtn.disabled = !hasSelection || !isWorking;
     deleteBtn.disabled = !hasSelection;
+    treeBtn.disabled = !hasSelection;
+    treeBtn.classList.toggle('active', agent?.gui_feedback === 'tree');
+    termBtn.disabled = !hasSelection;
     chatInput.disabled = !hasSelection || !containerOn;
 }
 
 // Render context messages
-// render a thin collapsed row (for command/environment blocks)
-function addThinBlock(cssClass, label, content) {
+// the context panel is a virtualized list: every message becomes one or more rows
+// (command/environment blocks get a thin collapsible row each), but only rows near the
+// viewport are in the DOM. a 'context' update appends rows for new messages instead of
+// rebuilding everything; images are decoded only when their row is expanded into view.
+
+// px of rows rendered above/below the viewport
+const OVERSCAN = 600;
+// height guesses until a row has been rendered and measured
+const THIN_ROW_HEIGHT = 28;
+const MESSAGE_ROW_HEIGHT = 80;
+// within this many px of the bottom counts as "following" — new messages keep it scrolled down
+const STICK_THRESHOLD = 30;
+
+// rows of the agent shown: {cssClass, label, text, src, thin, expanded, height, el}
+let contextRows = [];
+// per rendered message: key (to spot what changed) and index of its first row
+let contextKeys = [];
+let contextRowStart = [];
+let contextAgent = null;
+// top of each row in px, rebuilt when a height changes
+let rowOffsets = [0];
+let offsetsDirty = true;
+let renderPending = false;
+
+const topSpacer = document.createElement('div');
+const rowsBox = document.createElement('div');
+const bottomSpacer = document.createElement('div');
+contextMessages.append(topSpacer, rowsBox, bottomSpacer);
+
+// images load once they are (nearly) visible — collapsed LOOK rows never decode theirs
+const imageObserver = new IntersectionObserver((entries) => {
+    for (const entry of entries) {
+        if (!entry.isIntersecting) continue;
+        const img = entry.target;
+        img.src = img.dataset.src;
+        imageObserver.unobserve(img);
+    }
+}, { root: contextMessages, rootMargin: '200px' });
+
+// cheap identity for a message: role, block shapes, start of the text. avoids comparing base64
+function messageKey(msg) {
+    const blocks = msg.content || [];
+    const shape = blocks.map(b => b.type === 'image' ? `i${b.source.data.length}` : `t${(b.text || '').length}`).join(',');
+    return `${msg.role}|${shape}|${(blocks[0]?.text || '').slice(0, 64)}`;
+}
+
+// message -> row descriptors
+function messageRows(msg) {
+    if (msg.role === 'command') {
+        // each content block = its own thin row
+        return (msg.content || []).map(block => {
+            const text = block.text || '';
+            const name = text.match(/<func>(\w+)/)?.[1] || 'CMD';
+            return { cssClass: 'command', label: name, text, thin: true };
+        });
+    }
+    if (msg.role === 'environment') {
+        // each content block = its own thin row
+        return (msg.content || []).map(block => {
+            if (block.type === 'image') {
+                const src = `data:${block.source.media_type};base64,${block.source.data}`;
+                return { cssClass: 'environment', label: 'LOOK', src, thin: true };
+            }
+            const text = block.text || '';
+            const label = text.startsWith('[TERM]') ? 'TERM'
+                : text.startsWith('[READ') ? 'READ'
+                : text.startsWith('[WRITE') ? 'WRITE'
+                : text.startsWith('[EDIT') ? 'EDIT'
+                : text.startsWith('[TREE') ? 'TREE'
+                : text.startsWith('[WAIT') ? 'WAIT' : 'ENV';
+            return { cssClass: 'environment', label, text, thin: true };
+        });
+    }
+    // user + assistant — normal blocks
+    const text = msg.content?.map(b => b.text || '').join('') || '';
+    return [{ cssClass: msg.role, label: msg.role, text, thin: false }];
+}
+
+function buildRow(row) {
+    const wrap = document.createElement('div');
+    wrap.className = 'context-row';
     const div = document.createElement('div');
-    div.className = `message ${cssClass}`;
+    div.className = `message ${row.cssClass}`;
     const roleDiv = document.createElement('div');
     roleDiv.className = 'role';
-    roleDiv.textContent = label;
-    roleDiv.style.cursor = 'pointer';
+    roleDiv.textContent = row.label;
     const contentDiv = document.createElement('div');
-    contentDiv.className = 'content collapsed';
-    if (typeof content === 'string') { //content could be string or image
-        contentDiv.textContent = content;
+    contentDiv.className = row.thin && !row.expanded ? 'content collapsed' : 'content';
+    if (row.src) { //content could be string or image
+        const img = document.createElement('img');
+        img.dataset.src = row.src;
+        img.className = 'context-img';
+        contentDiv.appendChild(img);
+        imageObserver.observe(img);
+        row.img = img;
     } else {
-        contentDiv.appendChild(content);
+        contentDiv.textContent = row.text;
+    }
+    if (row.thin) {
+        // render a thin collapsed row (for command/environment blocks)
+        roleDiv.style.cursor = 'pointer';
+        roleDiv.onclick = () => {
+            row.expanded = !row.expanded;
+            contentDiv.classList.toggle('collapsed', !row.expanded);
+            // new height is measured on the next render
+            scheduleRender();
+        };
     }
-    roleDiv.onclick = () => contentDiv.classList.toggle('collapsed');
     div.appendChild(roleDiv);
     div.appendChild(contentDiv);
-    contextMessages.appendChild(div);
+    wrap.appendChild(div);
+    return wrap;
 }
 
-function renderContext(messages) {
-    contextMessages.innerHTML = '';
-    messages.forEach(msg => {
-        if (msg.role === 'command') {
-            // each content block = its own thin row
-            (msg.content || []).forEach(block => {
-                const text = block.text || '';
-                const name = text.match(/<func>(\w+)/)?.[1] || 'CMD';
-                addThinBlock('command', name, text);
-            });
-
-        } else if (msg.role === 'environment') {
-            // each content block = its own thin row
-            (msg.content || []).forEach(block => {
-                if (block.type === 'image') {
-                    const img = document.createElement('img');
-                    img.src = `data:${block.source.media_type};base64,${block.source.data}`;
-                    img.className = 'context-img';
-                    addThinBlock('environment', 'LOOK', img);
-                } else {
-                    const text = block.text || '';
-                    const label = text.startsWith('[TERM]') ? 'TERM'
-                        : text.startsWith('[READ') ? 'READ'
-                        : text.startsWith('[WRITE') ? 'WRITE'
-                        : text.startsWith('[EDIT') ? 'EDIT' : 'ENV';
-                    addThinBlock('environment', label, text);
-                }
-            });
-
-        } else {
-            // user + assistant — normal blocks
-            const div = document.createElement('div');
-            div.className = `message ${msg.role}`;
-            const roleDiv = document.createElement('div');
-            roleDiv.className = 'role';
-            roleDiv.textContent = msg.role;
-            const contentDiv = document.createElement('div');
-            contentDiv.className = 'content';
-            contentDiv.textContent = msg.content?.map(b => b.text || '').join('') || '';
-            div.appendChild(roleDiv);
-            div.appendChild(contentDiv);
-            contextMessages.appendChild(div);
-        }
+function dropRow(row) {
+    if (row.img) imageObserver.unobserve(row.img);
+    row.el = null;
+    row.img = null;
+}
+
+function rowHeight(row) {
+    return row.height ?? (row.thin ? THIN_ROW_HEIGHT : MESSAGE_ROW_HEIGHT);
+}
+
+function updateOffsets() {
+    rowOffsets = new Array(contextRows.length + 1);
+    rowOffsets[0] = 0;
+    for (let i = 0; i < contextRows.length; i++) rowOffsets[i + 1] = rowOffsets[i] + rowHeight(contextRows[i]);
+    offsetsDirty = false;
+}
+
+// first row whose bottom is below y
+function rowAt(y) {
+    let lo = 0, hi = contextRows.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (rowOffsets[mid + 1] <= y) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+}
+
+function scheduleRender() {
+    if (renderPending) return;
+    renderPending = true;
+    requestAnimationFrame(() => {
+        renderPending = false;
+        renderWindow();
     });
+}
+
+// put the rows near the viewport in the DOM, measure them, size the spacers for the rest
+function renderWindow() {
+    if (offsetsDirty) updateOffsets();
+    const top = contextMessages.scrollTop;
+    const first = rowAt(Math.max(top - OVERSCAN, 0));
+    const last = Math.min(rowAt(top + contextMessages.clientHeight + OVERSCAN) + 1, contextRows.length);
+
+    // rows leaving the window give up their elements
+    for (const el of [...rowsBox.children]) {
+        const i = Number(el.dataset.index);
+        if (i < first || i >= last || contextRows[i]?.el !== el) {
+            el.remove();
+            if (contextRows[i]?.el === el) dropRow(contextRows[i]);
+        }
+    }
+    let prev = null;
+    for (let i = first; i < last; i++) {
+        const row = contextRows[i];
+        if (!row.el) {
+            row.el = buildRow(row);
+            row.el.dataset.index = i;
+        }
+        // keep DOM order = row order
+        const expected = prev ? prev.nextSibling : rowsBox.firstChild;
+        if (expected !== row.el) rowsBox.insertBefore(row.el, expected);
+        prev = row.el;
+    }
+
+    let changed = false;
+    for (let i = first; i < last; i++) {
+        const row = contextRows[i];
+        const height = row.el.offsetHeight;
+        if (height !== row.height) {
+            row.height = height;
+            changed = true;
+        }
+    }
+    if (changed) updateOffsets();
+    topSpacer.style.height = `${rowOffsets[first]}px`;
+    bottomSpacer.style.height = `${rowOffsets[contextRows.length] - rowOffsets[last]}px`;
+}
+
+function resetContext(name) {
+    for (const row of contextRows) dropRow(row);
+    rowsBox.innerHTML = '';
+    contextRows = [];
+    contextKeys = [];
+    contextRowStart = [];
+    contextAgent = name;
+    offsetsDirty = true;
+    contextMessages.scrollTop = 0;
+    renderWindow();
+}
+
+function renderContext(name, messages) {
+    if (name !== contextAgent) resetContext(name);
+    const following = contextMessages.scrollTop + contextMessages.clientHeight >= contextMessages.scrollHeight - STICK_THRESHOLD;
+
+    // keep the rows of the unchanged prefix (usually everything — a turn only appends).
+    // a summary rewrites the middle, so rows are rebuilt from the first difference on
+    let same = 0;
+    while (same < contextKeys.length && same < messages.length && contextKeys[same] === messageKey(messages[same])) same++;
+    if (same < contextKeys.length) {
+        const cut = contextRowStart[same];
+        for (const row of contextRows.slice(cut)) {
+            if (row.el) row.el.remove();
+            dropRow(row);
+        }
+        contextRows.length = cut;
+        contextKeys.length = same;
+        contextRowStart.length = same;
+    }
+    for (let i = same; i < messages.length; i++) {
+        contextKeys.push(messageKey(messages[i]));
+        contextRowStart.push(contextRows.length);
+        for (const row of messageRows(messages[i])) contextRows.push(row);
+    }
+    offsetsDirty = true;
 
-    contextMessages.scrollTop = contextMessages.scrollHeight;
+    renderWindow();
+    if (following) {
+        // twice: the rows rendered at the new bottom get measured, which moves the bottom
+        contextMessages.scrollTop = contextMessages.scrollHeight;
+        renderWindow();
+        contextMessages.scrollTop = contextMessages.scrollHeight;
+    }
 }
 
+contextMessages.addEventListener('scroll', scheduleRender);
+window.addEventListener('resize', scheduleRender);
+
 // Event listeners
 createBtn.onclick = () => {
     const name = newAgentName.value.trim();
@@ -214,6 +492,13 @@ createBtn.onclick = () => {
     newAgentName.value = '';
 };
 
+// server boots containers in parallel (bounded), agents list updates as each comes up
+startAllBtn.onclick = () => {
+    send({ cmd: 'start_all' });
+};
+
+dashboardBtn.onclick = () => setDashboard(!dashboardMode);
+
 startBtn.onclick = () => {
     if (selectedAgent) {
         send({ cmd: 'start', name: selectedAgent });
@@ -228,9 +513,11 @@ pauseBtn.onclick = () => {
 
 deleteBtn.onclick = () => {
     if (selectedAgent && confirm(`Delete agent "${selectedAgent}"?`)) {
+        // the server drops the agent's terminal stream itself
+        if (termAgent === selectedAgent) termAgent = null;
         send({ cmd: 'delete', name: selectedAgent });
         selectedAgent = null;
-        contextMessages.innerHTML = '';
+        resetContext(null);
     }
 };
 
@@ -241,6 +528,20 @@ chatModeBtn.onclick = () => {
     send({ cmd: 'chat_mode', name: selectedAgent, enabled: chatMode });
 };
 
+// toggle auto-feedback for GUI windows between screenshots and accessibility tree text
+treeBtn.onclick = () => {
+    if (!selectedAgent) return;
+    const mode = agents[selectedAgent]?.gui_feedback === 'tree' ? 'look' : 'tree';
+    send({ cmd: 'gui_feedback', name: selectedAgent, mode: mode });
+};
+
+// live terminal text instead of VNC — much cheaper to watch than a VNC stream
+termBtn.onclick = () => {
+    termMode = !termMode;
+    termBtn.classList.toggle('active', termMode);
+    updateVnc();
+};
+
 // Enter to send (Shift+Enter for newline)
 chatInput.onkeydown = (e) => {
     if (e.key === 'Enter' && !e.shiftKey) {